@@ -0,0 +1,197 @@
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import String, bindparam, cast, func, select
+
+from db import ACADEMIC_YEAR, Section, SectionEvaluations, SessionManager
+
+# In-memory columnar copy of section_evaluations joined with sections, for
+# slicing results many ways without a database round trip per slice. Each
+# dimension is stored as an int32 code per row (codes index the dimension's
+# labels) and the measures as int64 columns, so a group-by is a handful of
+# vectorized passes over the arrays.
+
+# Dimension -> the SQL expression its values are read from. Terms look like
+# the "Fall 23" taken by get_results_by_semester.
+DIMENSIONS = {
+    "objective": SectionEvaluations.objective_id,
+    "course": Section.course_id,
+    "instructor": Section.instructor_id,
+    "term": Section.semester + " " + cast(Section.year, String),
+    "academic_year": ACADEMIC_YEAR,
+    "method": SectionEvaluations.evaluation_method,
+}
+MEASURES = ["students_met", "enrollment_count"]
+
+FACTS = select(
+    SectionEvaluations.section_id,
+    *[expression.label(name) for name, expression in DIMENSIONS.items()],
+    SectionEvaluations.students_met,
+    Section.enrollment_count,
+).join(Section, Section.id == SectionEvaluations.section_id)
+FACTS_FOR_SECTIONS = FACTS.where(
+    SectionEvaluations.section_id.in_(bindparam("section_ids", expanding=True))
+)
+FACTS_AFTER_SECTION = FACTS.where(
+    SectionEvaluations.section_id > bindparam("after_section_id")
+)
+
+
+class EvaluationCube:
+    def __init__(self):
+        self.codes = {name: {} for name in DIMENSIONS}  # value -> code
+        self.labels = {name: [] for name in DIMENSIONS}  # code -> value
+        self.size = 0
+        self.arrays = {"section_id": np.empty(0, np.int64)}
+        self.arrays.update((name, np.empty(0, np.int32)) for name in DIMENSIONS)
+        self.arrays.update((name, np.empty(0, np.int64)) for name in MEASURES)
+        self.max_section_id = 0
+
+    def column(self, name):
+        return self.arrays[name][: self.size]
+
+    # Append rows shaped like FACTS, growing the arrays geometrically so a
+    # load costs amortized O(1) copies per row
+    def append(self, rows):
+        if not rows:
+            return
+        end = self.size + len(rows)
+        capacity = len(self.arrays["section_id"])
+        if end > capacity:
+            capacity = max(end, 2 * capacity, 1024)
+            for name, array in self.arrays.items():
+                grown = np.empty(capacity, array.dtype)
+                grown[: self.size] = array[: self.size]
+                self.arrays[name] = grown
+        columns = list(zip(*rows))
+        self.arrays["section_id"][self.size : end] = columns[0]
+        for i, name in enumerate(DIMENSIONS, 1):
+            codes, labels = self.codes[name], self.labels[name]
+            encoded = []
+            for value in columns[i]:
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(labels)
+                    labels.append(value)
+                encoded.append(code)
+            self.arrays[name][self.size : end] = encoded
+        for i, name in enumerate(MEASURES, len(DIMENSIONS) + 1):
+            self.arrays[name][self.size : end] = [value or 0 for value in columns[i]]
+        self.size = end
+        self.max_section_id = max(self.max_section_id, max(columns[0]))
+
+    def load(self, db, chunk_size=10000):
+        for chunk in db.iter_query(FACTS, {}, chunk_size):
+            self.append(chunk)
+        return self
+
+    # Pick up evaluations of sections created since the last load or
+    # refresh. Evaluations added to, changed in or removed from existing
+    # sections need refresh() with their section ids.
+    def load_new_sections(self, db, chunk_size=10000):
+        params = {"after_section_id": self.max_section_id}
+        before = self.size
+        for chunk in db.iter_query(FACTS_AFTER_SECTION, params, chunk_size):
+            self.append(chunk)
+        return self.size - before
+
+    # Replace the rows of the given sections with their current rows, a
+    # few hundred sections per query as refresh_summary does
+    def refresh(self, db, section_ids, batch_size=500):
+        section_ids = list(section_ids)
+        keep = ~np.isin(self.column("section_id"), section_ids)
+        kept = int(keep.sum())
+        for name, array in self.arrays.items():
+            array[:kept] = array[: self.size][keep]
+        self.size = kept
+        for start in range(0, len(section_ids), batch_size):
+            params = {"section_ids": section_ids[start : start + batch_size]}
+            self.append(db.query(FACTS_FOR_SECTIONS, params))
+
+    # Rows selected by where, a {dimension: value or list of values} dict
+    def mask(self, where):
+        mask = np.ones(self.size, bool)
+        for name, values in where.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            codes = [self.codes[name][v] for v in values if v in self.codes[name]]
+            mask &= np.isin(self.column(name), codes)
+        return mask
+
+    # Totals per combination of the by dimensions over the rows matching
+    # where: [*labels, students_met, enrollment_count, percent] rows, like
+    # the SQL of sql_group. Percent is rounded half away from zero like
+    # SQL's ROUND, and None when nobody was enrolled.
+    def group(self, by, where=None):
+        mask = self.mask(where or {})
+        met = self.column("students_met")[mask]
+        enrolled = self.column("enrollment_count")[mask]
+        # One int64 key per row combining the dimension codes
+        sizes = [max(len(self.labels[name]), 1) for name in by]
+        if np.prod(sizes, dtype=float) >= 2**63:
+            raise ValueError(f"too many combinations to group by {by}")
+        keys = np.zeros(len(met), np.int64)
+        for name, size in zip(by, sizes):
+            keys = keys * size + self.column(name)[mask]
+        groups, inverse = np.unique(keys, return_inverse=True)
+        met = np.bincount(inverse, weights=met, minlength=len(groups))
+        enrolled = np.bincount(inverse, weights=enrolled, minlength=len(groups))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.floor(met * 100 / enrolled + 0.5)
+
+        labels = []
+        for name, size in reversed(list(zip(by, sizes))):
+            codes = groups % size
+            groups = groups // size
+            names = self.labels[name]
+            labels.append([names[code] for code in codes.tolist()])
+        labels.reverse()
+        return [
+            [*row_labels, int(m), int(e), None if e == 0 else p]
+            for *row_labels, m, e, p in zip(
+                *labels, met.tolist(), enrolled.tolist(), percent.tolist()
+            )
+        ]
+
+
+# The same totals computed by the database, for comparison with group()
+def sql_group(db, by, where=None):
+    met = func.sum(SectionEvaluations.students_met)
+    enrolled = func.sum(Section.enrollment_count)
+    statement = (
+        select(
+            *[DIMENSIONS[name] for name in by],
+            met,
+            enrolled,
+            func.round(met * 100.0 / enrolled),
+        )
+        .select_from(SectionEvaluations)
+        .join(Section, Section.id == SectionEvaluations.section_id)
+        .group_by(*[DIMENSIONS[name] for name in by])
+    )
+    for name, values in (where or {}).items():
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+        statement = statement.where(DIMENSIONS[name].in_(list(values)))
+    return db.query(statement)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load evaluations into NumPy and group them"
+    )
+    parser.add_argument(
+        "url", help="database URL, e.g. sqlite:///university_evaluation.db"
+    )
+    parser.add_argument("--by", nargs="+", choices=DIMENSIONS, default=["objective"])
+    parser.add_argument("--term", help='only this term, e.g. "Fall 23"')
+    args = parser.parse_args()
+
+    db = SessionManager(args.url)
+    start = time.perf_counter()
+    cube = EvaluationCube().load(db)
+    print(f"loaded {cube.size} evaluations in {time.perf_counter() - start:.2f}s")
+    where = {"term": args.term} if args.term else None
+    for row in cube.group(args.by, where):
+        print(*row, sep="\t")
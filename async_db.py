@@ -0,0 +1,201 @@
+import asyncio
+import sys
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from db import (
+    DEPARTMENT_GRAPH,
+    PROGRAMS_GRAPH,
+    REPORT_PAGES,
+    QueryStats,
+    ResultCache,
+    SessionManager,
+    statement_tables,
+)
+
+
+# SessionManager over one given session, so its write methods can run
+# unchanged inside AsyncSession.run_sync
+class BoundSessionManager(SessionManager):
+    def __init__(self, session, cache, query_stats):
+        self.bound_session = session
+        self.init_state(cache, query_stats)
+
+    @property
+    def session(self):
+        return self.bound_session
+
+    def remove(self):
+        pass
+
+
+# asyncio counterpart of SessionManager for running many reports at once,
+# e.g. with sqlite+aiosqlite:// or mysql+aiomysql:// URIs. Every call uses
+# its own session, so coroutines can await reports concurrently and their
+# I/O overlaps. The add_*/assign_*/bulk_* and get_* methods take the same
+# arguments as SessionManager's and are awaited; get_* with stream=True
+# returns an async iterator of chunks instead.
+class AsyncSessionManager:
+    def __init__(
+        self,
+        database_uri,
+        pool_size=None,
+        max_overflow=None,
+        pool_pre_ping=False,
+        pool_recycle=-1,
+        cache_size=256,
+        cache_ttl=30,
+    ):
+        engine_options = dict(pool_pre_ping=pool_pre_ping, pool_recycle=pool_recycle)
+        if pool_size is not None:
+            engine_options["pool_size"] = pool_size
+        if max_overflow is not None:
+            engine_options["max_overflow"] = max_overflow
+        self.engine = create_async_engine(database_uri, **engine_options)
+        # Entries returned by add_* stay readable after their session closes
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.cache = ResultCache(cache_size, cache_ttl)
+        self.query_stats = QueryStats()
+        self.query_stats.watch(SessionManager)
+        sync_engine = self.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self.query_stats.before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self.query_stats.after_execute)
+
+    # Run SessionManager.<name> in one session and transaction of its own
+    async def run_sync(self, name, *args, **kwargs):
+        async with self.Session() as session:
+            return await session.run_sync(
+                lambda session: getattr(
+                    BoundSessionManager(session, self.cache, self.query_stats), name
+                )(*args, **kwargs)
+            )
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+    async def query(self, query, params=None):
+        if isinstance(query, str):
+            query = text(query)
+        async with self.Session() as session:
+            result = await session.execute(query, params)
+            return [[attr for attr in row] for row in result]
+
+    async def iter_query(self, query, params=None, chunk_size=1000):
+        if isinstance(query, str):
+            query = text(query)
+        async with self.Session() as session:
+            result = await session.stream(query, params)
+            try:
+                async for partition in result.partitions(chunk_size):
+                    yield [[attr for attr in row] for row in partition]
+            finally:
+                await result.close()
+
+    async def page(self, statement, params, after=None, limit=100):
+        if statement not in REPORT_PAGES:
+            return await self.query(statement, params), None
+        first, rest, width = REPORT_PAGES[statement]
+        params = dict(params, limit=limit)
+        if after is None:
+            rows = await self.query(first, params)
+        else:
+            params.update((f"after_{i}", value) for i, value in enumerate(after))
+            rows = await self.query(rest, params)
+        next_after = tuple(rows[-1][-width:]) if len(rows) == limit else None
+        return [row[:-width] for row in rows], next_after
+
+    # Same contract as SessionManager.report; a plain method so that
+    # stream=True hands back the async iterator itself
+    def report(self, statement, params, stream=False, after=None, limit=None):
+        # The shared get_* method that called; its frame is gone by the
+        # time the statements run
+        method = self.query_stats.method_codes.get(sys._getframe(1).f_code)
+        if stream and limit is None:
+            return self.label_stream(method, self.iter_query(statement, params))
+        return self.cached_report(method, statement, params, after, limit)
+
+    async def cached_report(self, method, statement, params, after, limit):
+        key = (statement, tuple(sorted(params.items())), after, limit)
+        hit, result = self.cache.get(key)
+        if hit:
+            return result
+        generation = self.cache.generation
+        with self.query_stats.label(method):
+            if limit is not None:
+                result = await self.page(statement, params, after, limit)
+            else:
+                result = await self.query(statement, params)
+        self.cache.put(key, statement_tables(statement), result, generation)
+        return result
+
+    async def label_stream(self, method, chunks):
+        try:
+            while True:
+                with self.query_stats.label(method):
+                    try:
+                        chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    # The report methods only build parameters and return self.report(...),
+    # so SessionManager's are reused as they are
+    get_department_programs_by_name = SessionManager.get_department_programs_by_name
+    get_department_faculty_by_name = SessionManager.get_department_faculty_by_name
+    get_program_courses_by_name = SessionManager.get_program_courses_by_name
+    get_program_objectives_by_name = SessionManager.get_program_objectives_by_name
+    get_results_by_semester = SessionManager.get_results_by_semester
+    get_results_by_year = SessionManager.get_results_by_year
+    get_aggregate_results_by_year = SessionManager.get_aggregate_results_by_year
+    get_objective_subtree = SessionManager.get_objective_subtree
+    get_rollup_for_objective = SessionManager.get_rollup_for_objective
+
+    async def get_department_graph(self, department_name):
+        async with self.Session() as session:
+            result = await session.scalars(
+                DEPARTMENT_GRAPH, {"department_name": department_name}
+            )
+            return result.first()
+
+    async def get_programs_graph(self):
+        async with self.Session() as session:
+            result = await session.scalars(PROGRAMS_GRAPH)
+            return result.all()
+
+    # Run several reports concurrently and return their results in order.
+    # calls are (method name, args) pairs, e.g.
+    # ("get_results_by_semester", ("Fall 23", "Program 1-1")). At most
+    # concurrency reports run at once, which should not exceed the pool size
+    # (5 by default) or the rest just wait for a connection.
+    async def gather_reports(self, calls, concurrency=5):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(name, args):
+            async with semaphore:
+                return await getattr(self, name)(*args)
+
+        return await asyncio.gather(*(run(name, args) for name, args in calls))
+
+
+def mirror_write(name):
+    async def method(self, *args, **kwargs):
+        return await self.run_sync(name, *args, **kwargs)
+
+    method.__name__ = name
+    return method
+
+
+# Writers (and the summary maintenance) run SessionManager's own
+# implementation on the async connection, so they batch, refresh the
+# summary and invalidate the cache exactly as the synchronous ones do
+MIRRORED_METHODS = [
+    name
+    for name in vars(SessionManager)
+    if name.startswith(("add_", "assign_", "bulk_"))
+] + ["add", "add_all", "refresh_summary", "rebuild_summary", "check_summary"]
+for name in MIRRORED_METHODS:
+    setattr(AsyncSessionManager, name, mirror_write(name))
+del name
@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+
+import sqlalchemy
+
+from db import SQLITE_PROFILES, SessionManager
+from export import WRITERS, export_report
+from generate import (
+    SCALES,
+    SEMESTERS,
+    YEARS,
+    department_name,
+    generate_data,
+    program_name,
+)
+from gui import QUERIES, reset_database
+
+
+# Report calls exercised by the benchmark, with arguments that match the
+# data loaded by generate_data
+REPORTS = [
+    ("get_department_programs_by_name", (department_name(1),)),
+    ("get_department_faculty_by_name", (department_name(1),)),
+    ("get_program_courses_by_name", (program_name(1, 1),)),
+    ("get_program_objectives_by_name", (program_name(1, 1),)),
+    ("get_results_by_semester", ("Fall 23", program_name(1, 1))),
+    ("get_results_by_year", ("23-24",)),
+    ("get_aggregate_results_by_year", ("23-24",)),
+    ("get_objective_subtree", ("D001-00101-1",)),
+    ("get_rollup_for_objective", ("D001-00101-1",)),
+    ("get_department_graph", (department_name(1),)),
+    ("get_programs_graph", ()),
+]
+
+
+def time_call(fn, args, repeat):
+    fn(*args)  # warm up caches before timing
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_reports(db, repeat):
+    results = {}
+    for name, args in REPORTS:
+        results[name] = time_call(getattr(db, name), args, repeat)
+        db.remove()  # don't let one report's identity map slow the next
+    return results
+
+
+# Same report with a different name on every call, which is what the GUI
+# sees; statements that embed the name can never reuse a cached compile
+def bench_distinct_names(db, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        db.get_department_faculty_by_name(f"Department {i}")
+    return (time.perf_counter() - start) / repeat
+
+
+# Seconds per row for the single-row and bulk evaluation insert paths
+def bench_inserts(db, rows):
+    start = time.perf_counter()
+    for i in range(rows):
+        db.add_section_evaluation(1, "D001-00101-1", f"Single {i}", 1)
+    single = (time.perf_counter() - start) / rows
+
+    start = time.perf_counter()
+    db.bulk_add_section_evaluations(
+        (1 + i % 100, "D001-00101-1", f"Bulk {i}", 1) for i in range(rows)
+    )
+    bulk = (time.perf_counter() - start) / rows
+    return {"add_section_evaluation": single, "bulk_add_section_evaluations": bulk}
+
+
+# Rows per second exporting the largest report, a whole academic year of
+# section results, in each format; formats whose library is missing are
+# left out
+def bench_export(db):
+    results = {}
+    method, fields, headings = QUERIES[("Year", "evaluation")]
+    with tempfile.TemporaryDirectory() as tmp:
+        for format in WRITERS:
+            path = os.path.join(tmp, f"export.{format}")
+            try:
+                rows, seconds = export_report(
+                    db, method, ("23-24",), path, headings, format
+                )
+            except RuntimeError as e:
+                print(f"skipping {format} export: {e}")
+                continue
+            results[format] = rows / seconds if seconds else 0
+            db.remove()
+    return results
+
+
+# Seconds for a dashboard's worth of semester reports run one after another
+# and with AsyncSessionManager.gather_reports; only for SQLite, and skipped
+# when greenlet or aiosqlite is not installed
+def bench_gather(db, url):
+    calls = [
+        ("get_results_by_semester", (f"{semester} {year}", program_name(1, p)))
+        for semester in SEMESTERS
+        for year in YEARS
+        for p in (1, 2)
+    ]
+    start = time.perf_counter()
+    for name, args in calls:
+        getattr(db, name)(*args)
+    sequential = time.perf_counter() - start
+    db.remove()
+
+    async def gather():
+        try:
+            from async_db import AsyncSessionManager
+
+            async_db = AsyncSessionManager(
+                url.replace("sqlite://", "sqlite+aiosqlite://", 1), cache_size=0
+            )
+        except ImportError as e:
+            print(f"skipping gather_reports: {e}")
+            return None
+        start = time.perf_counter()
+        await async_db.gather_reports(calls)
+        elapsed = time.perf_counter() - start
+        await async_db.dispose()
+        return elapsed
+
+    if not url.startswith("sqlite://"):
+        return {"sequential": sequential}
+    return {"sequential": sequential, "gather_reports": asyncio.run(gather())}
+
+
+# Seconds to answer the same group-bys with SQL and from an EvaluationCube:
+# every term by objective and course, then every instructor by academic
+# year; the cube's load is timed separately. Skipped without NumPy.
+def bench_analytics(db):
+    try:
+        from analytics import EvaluationCube, sql_group
+    except ImportError as e:
+        print(f"skipping analytics: {e}")
+        return {}
+    slices = [
+        (("objective", "course"), {"term": f"{semester} {year}"})
+        for semester in SEMESTERS
+        for year in YEARS
+    ]
+    slices.append((("instructor", "academic_year"), None))
+
+    start = time.perf_counter()
+    sql = [sql_group(db, by, where) for by, where in slices]
+    sql_seconds = time.perf_counter() - start
+    db.remove()
+    start = time.perf_counter()
+    cube = EvaluationCube().load(db)
+    load_seconds = time.perf_counter() - start
+    db.remove()
+    start = time.perf_counter()
+    grouped = [cube.group(by, where) for by, where in slices]
+    cube_seconds = time.perf_counter() - start
+    for expected, rows in zip(sql, grouped):
+        assert sorted(map(tuple, expected)) == sorted(map(tuple, rows))
+    return {"sql": sql_seconds, "cube_load": load_seconds, "cube": cube_seconds}
+
+
+def bench_scale(url, scale, repeat, insert_rows, sqlite_profile=None):
+    # The result cache is off so every call reaches the database
+    db = SessionManager(url, cache_size=0, sqlite_profile=sqlite_profile)
+    reset_database(db.engine)
+    start = time.perf_counter()
+    counts = generate_data(db, scale)
+    seed_seconds = time.perf_counter() - start
+    db.remove()
+    result = {
+        "rows": counts,
+        "seed_seconds": seed_seconds,
+        "seed_rows_per_second": sum(counts.values()) / seed_seconds,
+        "reports": bench_reports(db, repeat),
+        "distinct_department_names": bench_distinct_names(db, repeat),
+        "exports": bench_export(db),
+        "gather": bench_gather(db, url),
+        "analytics": bench_analytics(db),
+        "inserts": bench_inserts(db, insert_rows),
+    }
+    db.engine.dispose()
+    return result
+
+
+def print_scale(scale, result, label=""):
+    print(f"== {scale}{label}: "
+          f"{sum(result['rows'].values())} rows seeded in "
+          f"{result['seed_seconds']:.2f}s "
+          f"({result['seed_rows_per_second']:.0f} rows/s)")
+    for name, seconds in result["reports"].items():
+        print(f"{name:36} {seconds * 1e6:12.1f} us/call")
+    seconds = result["distinct_department_names"]
+    print(f"{'distinct department names':36} {seconds * 1e6:12.1f} us/call")
+    for name, seconds in result["inserts"].items():
+        print(f"{name:36} {seconds * 1e6:12.1f} us/row")
+    for format, rate in result["exports"].items():
+        print(f"{format + ' export':36} {rate:12.0f} rows/s")
+    for name, seconds in result["gather"].items():
+        if seconds is not None:
+            print(f"{len(SEMESTERS) * len(YEARS) * 2} semester reports, "
+                  f"{name:14} {seconds * 1e3:9.1f} ms")
+    for name, seconds in result["analytics"].items():
+        print(f"{len(SEMESTERS) * len(YEARS) + 1} group-bys, "
+              f"{name:24} {seconds * 1e3:9.1f} ms")
+
+
+# Seeding, report and insert times of each SQLite profile side by side,
+# with the speedup over the first profile
+def print_profiles(runs, scale):
+    profiles = list(runs)
+    base = runs[profiles[0]][scale]
+    print(f"== {scale}: " + " vs ".join(profiles))
+    rows = [("seed", [runs[p][scale]["seed_seconds"] for p in profiles])]
+    rows += [(name, [runs[p][scale]["reports"][name] for p in profiles])
+             for name in base["reports"]]
+    rows += [(name, [runs[p][scale]["inserts"][name] for p in profiles])
+             for name in base["inserts"]]
+    for name, times in rows:
+        cells = " ".join(f"{t * 1e3:11.3f}ms {times[0] / t:5.2f}x"
+                         for t in times)
+        print(f"{name:36} {cells}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time SessionManager reports and inserts at several data scales"
+    )
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--insert-rows", type=int, default=500)
+    parser.add_argument(
+        "--url", help="database to benchmark (it is reset); defaults to a temporary SQLite file"
+    )
+    parser.add_argument(
+        "--sqlite-profiles",
+        nargs="+",
+        choices=["none"] + list(SQLITE_PROFILES),
+        default=["none", "tuned"],
+        help="connection PRAGMA profiles to compare on SQLite",
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "repeat": args.repeat,
+        "profiles": {},
+    }
+    sqlite = args.url is None or args.url.startswith("sqlite")
+    profiles = args.sqlite_profiles if sqlite else ["none"]
+    with tempfile.TemporaryDirectory() as tmp:
+        results["url"] = args.url or "sqlite (temporary file)"
+        for profile in profiles:
+            # WAL mode persists in the file, so each profile gets its own
+            url = args.url or f"sqlite:///{os.path.join(tmp, f'bench-{profile}.db')}"
+            runs = results["profiles"][profile] = {}
+            for scale in args.scales:
+                runs[scale] = bench_scale(
+                    url,
+                    scale,
+                    args.repeat,
+                    args.insert_rows,
+                    None if profile == "none" else profile,
+                )
+                label = f" ({profile} profile)" if sqlite else ""
+                print_scale(scale, runs[scale], label)
+        if len(profiles) > 1:
+            for scale in args.scales:
+                print_profiles(results["profiles"], scale)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -1,14 +1,43 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+import sys
+import threading
+import time
 from sqlalchemy import (
     Column,
+    Float,
     Integer,
     String,
     ForeignKey,
+    Table,
+    Index,
     Text,
+    and_,
+    bindparam,
+    case,
     create_engine,
+    delete,
+    event,
+    exists,
+    func,
+    inspect,
+    literal,
+    or_,
+    select,
     text,
+    tuple_,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.sql import visitors
+from sqlalchemy.orm import (
+    aliased,
+    relationship,
+    scoped_session,
+    selectinload,
+    sessionmaker,
+)
 
 Base = declarative_base()
 
@@ -28,7 +57,7 @@ class Faculty(Base):
     name = Column(String(255))
     email = Column(String(255), unique=True)
     rank = Column(String(50))
-    department_code = Column(String(4), ForeignKey("departments.code"))
+    department_code = Column(String(4), ForeignKey("departments.code"), index=True)
 
 
 class Program(Base):
@@ -36,7 +65,7 @@ class Program(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String(255), unique=True)
     department_code = Column(String(4), ForeignKey("departments.code"))
-    in_charge_id = Column(Integer, ForeignKey("faculty.id"))
+    in_charge_id = Column(Integer, ForeignKey("faculty.id"), index=True)
     courses = relationship("Course", secondary="program_courses")
 
 
@@ -51,12 +80,13 @@ class Course(Base):
 
 class Section(Base):
     __tablename__ = "sections"
+    __table_args__ = (Index("ix_sections_semester_year", "semester", "year"),)
     id = Column(Integer, primary_key=True)
     number = Column(Integer)
     semester = Column(String(20))
     year = Column(Integer)
-    course_id = Column(String(10), ForeignKey("courses.id"))
-    instructor_id = Column(Integer, ForeignKey("faculty.id"))
+    course_id = Column(String(10), ForeignKey("courses.id"), index=True)
+    instructor_id = Column(Integer, ForeignKey("faculty.id"), index=True)
     enrollment_count = Column(Integer)
 
 
@@ -64,21 +94,23 @@ class LearningObjective(Base):
     __tablename__ = "learning_objectives"
     id = Column(String(50), primary_key=True)
     description = Column(Text)
-    parent_id = Column(String(50), ForeignKey("learning_objectives.id"))
+    parent_id = Column(String(50), ForeignKey("learning_objectives.id"), index=True)
     sub_objectives = relationship("LearningObjective")
 
 
 class ProgramCourses(Base):
     __tablename__ = "program_courses"
     program_id = Column(Integer, ForeignKey("programs.id"), primary_key=True)
-    course_id = Column(String(10), ForeignKey("courses.id"), primary_key=True)
+    course_id = Column(
+        String(10), ForeignKey("courses.id"), primary_key=True, index=True
+    )
 
 
 class CourseObjectives(Base):
     __tablename__ = "course_objectives"
     course_id = Column(String(10), ForeignKey("courses.id"), primary_key=True)
     objective_id = Column(
-        String(50), ForeignKey("learning_objectives.id"), primary_key=True
+        String(50), ForeignKey("learning_objectives.id"), primary_key=True, index=True
     )
     program_id = Column(Integer, ForeignKey("programs.id"), primary_key=True)
 
@@ -86,46 +118,976 @@ class CourseObjectives(Base):
 class SectionEvaluations(Base):
     __tablename__ = "section_evaluations"
     section_id = Column(Integer, ForeignKey("sections.id"), primary_key=True)
-    objective_id = Column(String(50), ForeignKey("learning_objectives.id"), primary_key=True)
+    objective_id = Column(
+        String(50), ForeignKey("learning_objectives.id"), primary_key=True, index=True
+    )
     evaluation_method = Column(String(255), primary_key=True)
     students_met = Column(Integer)
 
 
+# Materialized per-evaluation results for the academic-year report, kept up
+# to date by the SessionManager writers (see refresh_summary)
+class EvaluationSummary(Base):
+    __tablename__ = "evaluation_summary"
+    __table_args__ = (
+        Index("ix_evaluation_summary_year_course", "academic_year", "course_id"),
+    )
+    section_id = Column(Integer, ForeignKey("sections.id"), primary_key=True)
+    objective_id = Column(
+        String(50), ForeignKey("learning_objectives.id"), primary_key=True, index=True
+    )
+    evaluation_method = Column(String(255), primary_key=True)
+    course_id = Column(String(10), ForeignKey("courses.id"))
+    academic_year = Column(Integer)  # year the academic year starts in
+    section_number = Column(Integer)
+    students_met = Column(Integer)
+    enrollment_count = Column(Integer)
+    percent_met = Column(Float)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+    version = Column(Integer, primary_key=True)
+
+
+# Migration step for databases created before the indexes were declared;
+# create_all (and so reset_database) builds them for new databases
+def create_missing_indexes(engine):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+# Schema migrations, applied in order by SessionManager.migrate to bring a
+# database up to SCHEMA_VERSION. Databases from before versioning count as
+# version 0, so every step must cope with part of it already being there.
+MIGRATIONS = [
+    (1, lambda db: Base.metadata.create_all(db.engine)),  # missing tables
+    (2, lambda db: create_missing_indexes(db.engine)),
+    (3, lambda db: db.rebuild_summary()),
+    (4, lambda db: db.rebuild_summary()),  # Spring 00 in academic year 99
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(engine):
+    if not inspect(engine).has_table(SchemaVersion.__tablename__):
+        return 0
+    with engine.connect() as connection:
+        version = connection.execute(select(func.max(SchemaVersion.version)))
+        return version.scalar() or 0
+
+
+def set_schema_version(engine, version):
+    with engine.begin() as connection:
+        connection.execute(delete(SchemaVersion.__table__))
+        connection.execute(SchemaVersion.__table__.insert(), {"version": version})
+
+
+# Report statements are built once with bound parameters, so SQLAlchemy's
+# compiled cache and the server's statement cache are reused across calls
+
+# List all of its programs
+DEPARTMENT_PROGRAMS = (
+    select(Program.name)
+    .select_from(Department)
+    .join(Program, Department.code == Program.department_code)
+    .where(Department.name == bindparam("department_name"))
+)
+
+# List all of its faculty (including what program each faculty is in charge of, if there is one)
+DEPARTMENT_FACULTY = (
+    select(Faculty.name, Program.name)
+    .select_from(Department)
+    .join(Faculty, Department.code == Faculty.department_code)
+    .outerjoin(Program, Faculty.id == Program.in_charge_id)
+    .where(Department.name == bindparam("department_name"))
+)
+
+# List all the courses, together with the objectives/sub-objectives association with year
+PROGRAM_COURSES = (
+    select(Course.title, LearningObjective.description)
+    .select_from(Course)
+    .join(ProgramCourses, Course.id == ProgramCourses.course_id)
+    .join(Program, Program.id == ProgramCourses.program_id)
+    .outerjoin(CourseObjectives, CourseObjectives.course_id == Course.id)
+    .outerjoin(LearningObjective, CourseObjectives.objective_id == LearningObjective.id)
+    .where(Program.name == bindparam("program_name"))
+)
+
+# List all of the objectives
+PROGRAM_OBJECTIVES = (
+    select(LearningObjective.description)
+    .distinct()
+    .select_from(Course)
+    .join(ProgramCourses, Course.id == ProgramCourses.course_id)
+    .join(Program, Program.id == ProgramCourses.program_id)
+    .join(CourseObjectives, CourseObjectives.course_id == Course.id)
+    .join(LearningObjective, CourseObjectives.objective_id == LearningObjective.id)
+    .where(Program.name == bindparam("program_name"))
+)
+
+# List all of the evaluation results for each objective/sub-objective (If data for some sections has not been entered, indicate that information is not found)
+RESULTS_BY_SEMESTER = (
+    select(
+        Course.title,
+        Section.number,
+        SectionEvaluations.evaluation_method,
+        SectionEvaluations.students_met,
+    )
+    .select_from(Course)
+    .join(Section, Course.id == Section.course_id)
+    .join(ProgramCourses, Course.id == ProgramCourses.course_id)
+    .join(Program, Program.id == ProgramCourses.program_id)
+    .outerjoin(SectionEvaluations, Section.id == SectionEvaluations.section_id)
+    .where(
+        Section.semester == bindparam("semester"),
+        Section.year == bindparam("year"),
+        Program.name == bindparam("program_name"),
+    )
+)
+
+# An academic year runs Summer and Fall of its first year, then Spring of
+# the next one
+ACADEMIC_YEAR = case(
+    # Years are two digits, so Spring 00 closes academic year 99-00
+    (and_(Section.semester == "Spring", Section.year == 0), 99),
+    (Section.semester == "Spring", Section.year - 1),
+    (Section.semester.in_(["Summer", "Fall"]), Section.year),
+)
+
+
+# The first year of an academic year written like "23-24"
+def first_year(year):
+    try:
+        first, second = (int(part) for part in year.split("-"))
+    except ValueError:
+        raise ValueError(f"{year!r} is not an academic year like 23-24")
+    if second != (first + 1) % 100:
+        raise ValueError(f"{year!r} is not an academic year like 23-24")
+    return first
+
+
+# Rows of evaluation_summary computed from the raw tables
+SUMMARY_SOURCE = (
+    select(
+        SectionEvaluations.section_id,
+        SectionEvaluations.objective_id,
+        SectionEvaluations.evaluation_method,
+        Section.course_id,
+        ACADEMIC_YEAR,
+        Section.number,
+        SectionEvaluations.students_met,
+        Section.enrollment_count,
+        func.round(
+            SectionEvaluations.students_met * 100.0 / Section.enrollment_count
+        ),
+    )
+    .select_from(SectionEvaluations)
+    .join(Section, Section.id == SectionEvaluations.section_id)
+)
+SUMMARY_COLUMNS = [
+    "section_id",
+    "objective_id",
+    "evaluation_method",
+    "course_id",
+    "academic_year",
+    "section_number",
+    "students_met",
+    "enrollment_count",
+    "percent_met",
+]
+REBUILD_SUMMARY = EvaluationSummary.__table__.insert().from_select(
+    SUMMARY_COLUMNS, SUMMARY_SOURCE
+)
+REFRESH_SUMMARY = EvaluationSummary.__table__.insert().from_select(
+    SUMMARY_COLUMNS,
+    SUMMARY_SOURCE.where(
+        SectionEvaluations.section_id.in_(bindparam("section_ids", expanding=True))
+    ),
+)
+CLEAR_SUMMARY = delete(EvaluationSummary.__table__).where(
+    EvaluationSummary.section_id.in_(bindparam("section_ids", expanding=True))
+)
+
+# List all of the evaluation results for each objective/sub-objective
+# Show course/section involved in evaluation, list result for each course/section, and aggregate the result to show the number (and percentage) of student
+# Read from evaluation_summary, whose rows check_summary compares with the
+# raw tables. Evaluations only count towards objectives assigned to the
+# course in some program.
+RESULTS_BY_YEAR_SUMMARY = (
+    select(
+        LearningObjective.description,
+        Course.title,
+        EvaluationSummary.section_number,
+        EvaluationSummary.evaluation_method,
+        EvaluationSummary.students_met,
+        EvaluationSummary.percent_met.label("percent"),
+    )
+    .select_from(EvaluationSummary)
+    .join(Course, Course.id == EvaluationSummary.course_id)
+    .join(LearningObjective, LearningObjective.id == EvaluationSummary.objective_id)
+    .where(
+        EvaluationSummary.academic_year == bindparam("first_year"),
+        exists().where(
+            CourseObjectives.course_id == EvaluationSummary.course_id,
+            CourseObjectives.objective_id == EvaluationSummary.objective_id,
+        ),
+    )
+    .order_by(Course.id, EvaluationSummary.section_id)
+)
+
+
+# Per objective and course totals for an academic year, with the objective
+# and overall totals alongside, reduced by the database in one pass. Window
+# functions work on both SQLite (3.25+) and MySQL 8, unlike WITH ROLLUP.
+met = func.sum(EvaluationSummary.students_met)
+evaluated = func.sum(EvaluationSummary.enrollment_count)
+by_objective = dict(partition_by=EvaluationSummary.objective_id)
+AGGREGATE_RESULTS_BY_YEAR = (
+    select(
+        LearningObjective.description,
+        Course.title,
+        met.label("students_met"),
+        evaluated.label("students_evaluated"),
+        func.round(met * 100.0 / evaluated).label("percent"),
+        func.sum(met).over(**by_objective).label("objective_students_met"),
+        func.sum(evaluated).over(**by_objective).label("objective_students_evaluated"),
+        func.round(
+            func.sum(met).over(**by_objective)
+            * 100.0
+            / func.sum(evaluated).over(**by_objective)
+        ).label("objective_percent"),
+        func.round(func.sum(met).over() * 100.0 / func.sum(evaluated).over()).label(
+            "overall_percent"
+        ),
+    )
+    .select_from(EvaluationSummary)
+    .join(Course, Course.id == EvaluationSummary.course_id)
+    .join(LearningObjective, LearningObjective.id == EvaluationSummary.objective_id)
+    .where(
+        EvaluationSummary.academic_year == bindparam("first_year"),
+        exists().where(
+            CourseObjectives.course_id == EvaluationSummary.course_id,
+            CourseObjectives.objective_id == EvaluationSummary.objective_id,
+        ),
+    )
+    .group_by(
+        EvaluationSummary.objective_id,
+        LearningObjective.description,
+        EvaluationSummary.course_id,
+        Course.title,
+    )
+    .order_by(EvaluationSummary.objective_id, EvaluationSummary.course_id)
+)
+del met, evaluated, by_objective
+
+
+# Learning objective hierarchy, walked with recursive CTEs (WITH RECURSIVE
+# is supported by SQLite and MySQL 8) so a whole subtree costs one query.
+# The depth limit stops a cycle in parent_id from recursing forever.
+MAX_OBJECTIVE_DEPTH = 32
+child_objective = aliased(LearningObjective)
+objective_tree = (
+    select(
+        LearningObjective.id,
+        LearningObjective.parent_id,
+        literal(0).label("depth"),
+    )
+    .where(LearningObjective.id == bindparam("objective_id"))
+    .cte("objective_tree", recursive=True)
+)
+objective_tree = objective_tree.union_all(
+    select(
+        child_objective.id,
+        child_objective.parent_id,
+        objective_tree.c.depth + 1,
+    ).where(
+        child_objective.parent_id == objective_tree.c.id,
+        objective_tree.c.depth < MAX_OBJECTIVE_DEPTH,
+    )
+)
+
+OBJECTIVE_SUBTREE = (
+    select(
+        objective_tree.c.id,
+        objective_tree.c.parent_id,
+        objective_tree.c.depth,
+        LearningObjective.description,
+    )
+    .join(LearningObjective, LearningObjective.id == objective_tree.c.id)
+    .order_by(objective_tree.c.depth, objective_tree.c.id)
+)
+
+# (ancestor, descendant) pairs for every node of the subtree, itself
+# included, so results can be summed up to each ancestor
+objective_closure = (
+    select(
+        objective_tree.c.id.label("ancestor_id"),
+        objective_tree.c.id.label("descendant_id"),
+        literal(0).label("depth"),
+    )
+    .cte("objective_closure", recursive=True)
+)
+objective_closure = objective_closure.union_all(
+    select(
+        objective_closure.c.ancestor_id,
+        child_objective.id,
+        objective_closure.c.depth + 1,
+    ).where(
+        child_objective.parent_id == objective_closure.c.descendant_id,
+        objective_closure.c.depth < MAX_OBJECTIVE_DEPTH,
+    )
+)
+objective_totals = (
+    select(
+        objective_closure.c.ancestor_id,
+        func.sum(EvaluationSummary.students_met).label("students_met"),
+        func.sum(EvaluationSummary.enrollment_count).label("students_evaluated"),
+    )
+    .select_from(objective_closure)
+    .outerjoin(
+        EvaluationSummary,
+        and_(
+            EvaluationSummary.objective_id == objective_closure.c.descendant_id,
+            or_(
+                bindparam("academic_year", type_=Integer).is_(None),
+                EvaluationSummary.academic_year == bindparam("academic_year"),
+            ),
+            # Only evaluations the year reports count, as in
+            # RESULTS_BY_YEAR_SUMMARY
+            exists().where(
+                CourseObjectives.course_id == EvaluationSummary.course_id,
+                CourseObjectives.objective_id == EvaluationSummary.objective_id,
+            ),
+        ),
+    )
+    .group_by(objective_closure.c.ancestor_id)
+    .subquery()
+)
+
+# Every node of the subtree with the evaluation results of its own subtree
+# rolled up into it; the first row is the requested objective
+OBJECTIVE_ROLLUP = (
+    select(
+        objective_tree.c.id,
+        objective_tree.c.parent_id,
+        objective_tree.c.depth,
+        LearningObjective.description,
+        objective_totals.c.students_met,
+        objective_totals.c.students_evaluated,
+        func.round(
+            objective_totals.c.students_met * 100.0 / objective_totals.c.students_evaluated
+        ).label("percent"),
+    )
+    .join(LearningObjective, LearningObjective.id == objective_tree.c.id)
+    .join(objective_totals, objective_totals.c.ancestor_id == objective_tree.c.id)
+    .order_by(objective_tree.c.depth, objective_tree.c.id)
+)
+del child_objective, objective_tree, objective_closure, objective_totals
+
+
+# Object-graph reports. Relationships are lazy by default, so walking them
+# costs a query per object; these load each level with one SELECT ... IN
+# instead, a fixed number of queries however many rows there are.
+PROGRAM_GRAPH_OPTIONS = selectinload(Program.courses).selectinload(Course.sections)
+DEPARTMENT_GRAPH = (
+    select(Department)
+    .where(Department.name == bindparam("department_name"))
+    .options(
+        selectinload(Department.faculty),
+        selectinload(Department.programs).options(PROGRAM_GRAPH_OPTIONS),
+    )
+)
+PROGRAMS_GRAPH = select(Program).options(PROGRAM_GRAPH_OPTIONS).order_by(Program.id)
+
+
+# Keyset pagination: each report is re-ordered by a unique key (columns from
+# outer joins are coalesced so they never compare as NULL) and the next
+# page starts strictly after the last key seen, so fetching page n costs
+# the same as fetching page 1
+def keyset_pages(statement, keys):
+    ordered = (
+        statement.add_columns(*keys)
+        .order_by(None)
+        .order_by(*keys)
+        .limit(bindparam("limit"))
+    )
+    after = tuple_(*[bindparam(f"after_{i}") for i in range(len(keys))])
+    return ordered, ordered.where(tuple_(*keys) > after), len(keys)
+
+
+REPORT_PAGES = {
+    DEPARTMENT_PROGRAMS: keyset_pages(DEPARTMENT_PROGRAMS, [Program.id]),
+    DEPARTMENT_FACULTY: keyset_pages(
+        DEPARTMENT_FACULTY, [Faculty.id, func.coalesce(Program.id, 0)]
+    ),
+    PROGRAM_COURSES: keyset_pages(
+        PROGRAM_COURSES,
+        [
+            Course.id,
+            func.coalesce(CourseObjectives.objective_id, ""),
+            func.coalesce(CourseObjectives.program_id, 0),
+        ],
+    ),
+    PROGRAM_OBJECTIVES: keyset_pages(
+        PROGRAM_OBJECTIVES, [LearningObjective.description]
+    ),
+    RESULTS_BY_SEMESTER: keyset_pages(
+        RESULTS_BY_SEMESTER,
+        [
+            Section.id,
+            func.coalesce(SectionEvaluations.objective_id, ""),
+            func.coalesce(SectionEvaluations.evaluation_method, ""),
+        ],
+    ),
+    RESULTS_BY_YEAR_SUMMARY: keyset_pages(
+        RESULTS_BY_YEAR_SUMMARY,
+        [
+            Course.id,
+            EvaluationSummary.section_id,
+            EvaluationSummary.objective_id,
+            EvaluationSummary.evaluation_method,
+        ],
+    ),
+}
+
+
+# Names of the tables a statement reads, which decide which writes
+# invalidate its cached results
+STATEMENT_TABLES = {}
+
+
+def statement_tables(statement):
+    if statement not in STATEMENT_TABLES:
+        STATEMENT_TABLES[statement] = frozenset(
+            element.name
+            for element in visitors.iterate(statement)
+            if isinstance(element, Table)
+        )
+    return STATEMENT_TABLES[statement]
+
+
+# Report results are lists of rows or (rows, next_after) pages. The cache
+# keeps and hands out copies so callers can change the rows they get.
+def copy_result(value):
+    if isinstance(value, tuple):
+        rows, next_after = value
+        return copy_result(rows), next_after
+    return [list(row) for row in value]
+
+
+# LRU cache of report results with an optional time-to-live. Entries record
+# the tables they were read from so a write only drops the ones it affects.
+class ResultCache:
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires, tables, value)
+        self.lock = threading.Lock()
+        # Bumped by every invalidation, so a result read before a write
+        # that finishes after it is not cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires, tables, value = entry
+                if expires is None or expires > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return True, copy_result(value)
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tables, value, generation):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            expires = None if self.ttl is None else time.monotonic() + self.ttl
+            self.entries[key] = (expires, tables, copy_result(value))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        with self.lock:
+            self.generation += 1
+            stale = [key for key, entry in self.entries.items() if entry[1] & tables]
+            for key in stale:
+                del self.entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# PRAGMAs run on every new SQLite connection, by profile name. "tuned"
+# trades durability of the last transactions on power loss (not on a crash
+# of the app) for much cheaper commits: WAL lets readers and the writer
+# run concurrently, synchronous=NORMAL only syncs at checkpoints, and the
+# page cache (64 MiB), memory map (256 MiB) and in-memory temp tables keep
+# report scans and sorts off the disk. Both profiles enforce foreign keys,
+# which SQLite leaves off by default.
+SQLITE_PROFILES = {
+    "default": [("foreign_keys", "ON")],
+    "tuned": [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("cache_size", -64 * 1024),
+        ("mmap_size", 256 * 1024 * 1024),
+        ("temp_store", "MEMORY"),
+        ("foreign_keys", "ON"),
+    ],
+}
+
+
+def apply_sqlite_profile(engine, profile):
+    pragmas = SQLITE_PROFILES[profile]
+
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    event.listen(engine, "connect", set_sqlite_pragmas)
+
+
+# Upper bounds, in seconds, of the query latency histogram buckets; the last
+# bucket counts everything slower
+LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0]
+
+
+# Method the running statements are attributed to, set by QueryStats.label
+QUERY_LABEL = ContextVar("query_label", default=None)
+
+
+# Per-method query statistics fed by the engine's cursor events: calls,
+# rows, total and slowest latency and a latency histogram for each
+# SessionManager method, plus a log of statements slower than slow_seconds
+class QueryStats:
+    def __init__(self, slow_seconds=None, slow_log=None):
+        self.slow_seconds = slow_seconds
+        self.slow_log = slow_log
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.methods = {}  # method -> [count, rows, total, slowest, buckets]
+        self.slow_queries = 0
+        # Code objects of SessionManager's methods, to find the caller of
+        # a statement on the stack
+        self.method_codes = {}
+
+    def watch(self, cls):
+        for name, attr in vars(cls).items():
+            code = getattr(attr, "__code__", None)
+            if code is not None:
+                self.method_codes[code] = name
+
+    # The outermost SessionManager method on the stack, e.g. the get_*
+    # report rather than the query() it calls
+    def caller(self):
+        method = None
+        frame = sys._getframe(2)
+        while frame is not None:
+            method = self.method_codes.get(frame.f_code, method)
+            frame = frame.f_back
+        return method or "(direct)"
+
+    # Attribute the statements run while the block runs to method, for
+    # reports whose statements run far from the method on the stack
+    # (streams are driven by whoever consumes them, async reports by the
+    # event loop). A context variable, so each thread and each asyncio
+    # task has its own.
+    @contextmanager
+    def label(self, method):
+        token = QUERY_LABEL.set(method)
+        try:
+            yield
+        finally:
+            QUERY_LABEL.reset(token)
+
+    def label_stream(self, method, chunks):
+        try:
+            while True:
+                with self.label(method):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+
+    # Start times are kept on the connection, as an asyncio thread runs
+    # several connections' statements at once
+    def before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        method = QUERY_LABEL.get() or self.caller()
+        # Writes report their row count here; a SELECT's rows are added by
+        # query() and iter_query() as they are fetched, as few drivers know
+        # the count up front
+        rows = max(cursor.rowcount, 0) if cursor.description is None else 0
+        self.local.method = method
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        slow = self.slow_seconds is not None and seconds >= self.slow_seconds
+        with self.lock:
+            entry = self.methods.get(method)
+            if entry is None:
+                entry = [0, 0, 0.0, 0.0, [0] * (len(LATENCY_BUCKETS) + 1)]
+                self.methods[method] = entry
+            entry[0] += 1
+            entry[1] += rows
+            entry[2] += seconds
+            entry[3] = max(entry[3], seconds)
+            entry[4][bucket] += 1
+            self.slow_queries += slow
+        if slow and self.slow_log:
+            line = (
+                f"{time.strftime('%Y-%m-%d %H:%M:%S')} {seconds * 1e3:.1f}ms {method} "
+                f"{' '.join(statement.split())} {str(parameters)[:200]}\n"
+            )
+            with self.lock, open(self.slow_log, "a") as f:
+                f.write(line)
+
+    # Rows fetched by the calling thread for the statement it ran last
+    def fetched(self, rows):
+        method = QUERY_LABEL.get() or getattr(self.local, "method", None)
+        if method is None:
+            return
+        with self.lock:
+            if method in self.methods:
+                self.methods[method][1] += rows
+
+    def reset(self):
+        with self.lock:
+            self.methods.clear()
+            self.slow_queries = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                method: {
+                    "count": count,
+                    "rows": rows,
+                    "total": total,
+                    "mean": total / count,
+                    "max": slowest,
+                    "histogram": list(buckets),
+                }
+                for method, (count, rows, total, slowest, buckets) in self.methods.items()
+            }
+
+
 class SessionManager:
-    def __init__(self, database_uri):
-        self.engine = create_engine(database_uri)
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+    # Pool settings left as None use the dialect's defaults (in-memory SQLite
+    # does not accept pool_size/max_overflow, for instance). sqlite_profile
+    # names one of SQLITE_PROFILES and is ignored for other databases.
+    #
+    # Writes through this SessionManager drop the cached reports they
+    # affect, but writes by other processes (the importer, the service, a
+    # second GUI on the same server) cannot, so cached reports expire after
+    # cache_ttl seconds; cache_ttl=None keeps them until evicted.
+    #
+    # With replica_uris the get_* reports read from the replicas, picked
+    # round-robin or, with replica_policy="least_loaded", by fewest reads in
+    # flight; everything else uses database_uri, the primary. Replicas lag,
+    # so read_your_writes=N sends a thread's reads to the primary for N
+    # seconds after it commits, bypassing the result cache, and cache_ttl
+    # bounds how long results read from a lagging replica can be served.
+    def __init__(
+        self,
+        database_uri,
+        pool_size=None,
+        max_overflow=None,
+        pool_pre_ping=False,
+        pool_recycle=-1,
+        cache_size=256,
+        cache_ttl=30,
+        slow_query_seconds=None,
+        slow_query_log=None,
+        sqlite_profile=None,
+        replica_uris=(),
+        replica_policy="round_robin",
+        read_your_writes=None,
+    ):
+        engine_options = dict(pool_pre_ping=pool_pre_ping, pool_recycle=pool_recycle)
+        if pool_size is not None:
+            engine_options["pool_size"] = pool_size
+        if max_overflow is not None:
+            engine_options["max_overflow"] = max_overflow
+        if replica_policy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"unknown replica policy {replica_policy!r}")
+        # Statements slower than slow_query_seconds are appended to
+        # slow_query_log
+        self.query_stats = QueryStats(slow_query_seconds, slow_query_log)
+        self.query_stats.watch(SessionManager)
 
-    def add(self, entry):
+        def make_engine(uri):
+            engine = create_engine(uri, **engine_options)
+            if sqlite_profile is not None and engine.dialect.name == "sqlite":
+                apply_sqlite_profile(engine, sqlite_profile)
+            event.listen(engine, "before_cursor_execute", self.query_stats.before_execute)
+            event.listen(engine, "after_cursor_execute", self.query_stats.after_execute)
+            return engine
+
+        self.engine = make_engine(database_uri)
+        # Each thread gets its own session (and connection from the pool)
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        self.replica_engines = [make_engine(uri) for uri in replica_uris]
+        self.init_state(
+            ResultCache(cache_size, cache_ttl),
+            self.query_stats,
+            [
+                scoped_session(sessionmaker(bind=engine))
+                for engine in self.replica_engines
+            ],
+            replica_policy,
+            read_your_writes,
+        )
+
+    # Everything but the engines and sessions, shared with subclasses that
+    # bring their own session (async_db's BoundSessionManager)
+    def init_state(
+        self,
+        cache,
+        query_stats,
+        replicas=(),
+        replica_policy="round_robin",
+        read_your_writes=None,
+    ):
+        self.local = threading.local()
+        self.cache = cache
+        self.query_stats = query_stats
+        self.replicas = list(replicas)
+        self.replica_policy = replica_policy
+        self.read_your_writes = read_your_writes
+        self.replica_lock = threading.Lock()
+        self.replica_loads = [0] * len(self.replicas)  # reads in flight
+        self.replica_reads = [0] * len(self.replicas)
+        self.primary_reads = 0
+        self.next_replica = 0
+
+    @property
+    def session(self):
+        return self.Session()
+
+    @property
+    def in_transaction(self):
+        return getattr(self.local, "in_transaction", False)
+
+    @in_transaction.setter
+    def in_transaction(self, value):
+        self.local.in_transaction = value
+
+    # Record a write to tables: cached results that read them are dropped
+    # now, and again once the write commits in case another thread cached
+    # the old rows in between
+    def written(self, *tables):
+        tables = frozenset(tables)
+        self.cache.invalidate(tables)
+        if not hasattr(self.local, "written"):
+            self.local.written = set()
+        self.local.written |= tables
+
+    def invalidate_written(self):
+        written = getattr(self.local, "written", None)
+        if written:
+            self.local.written = set()
+            self.cache.invalidate(frozenset(written))
+            self.local.last_write = time.monotonic()
+
+    # Whether the calling thread committed a write less than read_your_writes
+    # seconds ago, so that its reads must see the primary
+    def recently_wrote(self):
+        if self.read_your_writes is None:
+            return False
+        last_write = getattr(self.local, "last_write", None)
+        return (
+            last_write is not None
+            and time.monotonic() - last_write < self.read_your_writes
+        )
+
+    # The replica a report should read from, as an index into
+    # self.replicas, or None for the primary. Reads inside a transaction
+    # and reads soon after the thread's own writes stay on the primary.
+    def choose_replica(self):
+        if not self.replicas or self.in_transaction or self.recently_wrote():
+            return None
+        return self.pick_replica()
+
+    def pick_replica(self):
+        with self.replica_lock:
+            if self.replica_policy == "least_loaded":
+                loads = self.replica_loads
+                replica = min(range(len(loads)), key=loads.__getitem__)
+            else:
+                replica = self.next_replica
+                self.next_replica = (replica + 1) % len(self.replicas)
+            self.replica_loads[replica] += 1
+            self.replica_reads[replica] += 1
+        return replica
+
+    # Run fn(session) on the session choose_replica picks
+    def read(self, fn):
+        return self.read_from(self.choose_replica(), fn)
+
+    def read_from(self, replica, fn):
+        if replica is None:
+            with self.replica_lock:
+                self.primary_reads += 1
+            return fn(self.session)
         try:
-            self.session.add(entry)
+            return fn(self.replicas[replica]())
+        finally:
+            with self.replica_lock:
+                self.replica_loads[replica] -= 1
+
+    # Streaming counterpart of read: the replica counts as loaded until the
+    # stream is exhausted or closed
+    def read_stream(self, fn):
+        replica = self.choose_replica()
+        if replica is None:
+            with self.replica_lock:
+                self.primary_reads += 1
+            yield from fn(self.session)
+            return
+        try:
+            yield from fn(self.replicas[replica]())
+        finally:
+            with self.replica_lock:
+                self.replica_loads[replica] -= 1
+
+    def replica_stats(self):
+        with self.replica_lock:
+            return {
+                "primary_reads": self.primary_reads,
+                "replica_reads": list(self.replica_reads),
+                "replica_loads": list(self.replica_loads),
+            }
+
+    # Apply the migrations this database has not seen yet; returns the
+    # versions applied, empty when the schema is already current
+    def migrate(self):
+        applied = []
+        version = get_schema_version(self.engine)
+        for target, step in MIGRATIONS:
+            if target > version:
+                step(self)
+                set_schema_version(self.engine, target)
+                applied.append(target)
+        return applied
+
+    # Close the calling thread's session and give its connection back to
+    # the pool; background workers should call this when they finish
+    def remove(self):
+        self.Session.remove()
+        for replica in self.replicas:
+            replica.remove()
+
+    # Group writes into one unit of work: add_* calls made inside the block
+    # are flushed together and committed once on exit, or all rolled back
+    # if the block raises. Nested blocks join the outer one.
+    @contextmanager
+    def transaction(self):
+        if self.in_transaction:
+            yield self
+            return
+        self.in_transaction = True
+        try:
+            yield self
             self.session.commit()
         except:
             self.session.rollback()
             raise
+        finally:
+            self.in_transaction = False
+            self.invalidate_written()
+
+    def commit(self):
+        if not self.in_transaction:
+            try:
+                self.session.commit()
+            finally:
+                self.invalidate_written()
+
+    def add(self, entry):
+        try:
+            self.session.add(entry)
+            self.written(entry.__table__.name)
+            self.commit()
+        except:
+            if not self.in_transaction:
+                self.session.rollback()
+            raise
+        return entry
+
+    # Insert many rows of one model with executemany, batch_size rows per
+    # statement, committing once at the end (or with the enclosing
+    # transaction)
+    def add_all(self, model, rows, batch_size=1000):
+        rows = iter(rows)
+        try:
+            self.session.flush()
+            self.written(model.__table__.name)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self.session.execute(model.__table__.insert(), batch)
+            self.commit()
+        except:
+            if not self.in_transaction:
+                self.session.rollback()
+            raise
 
     def add_department(self, name, code):
         new_department = Department(name=name, code=code)
-        self.add(new_department)
+        return self.add(new_department)
 
     def add_faculty(self, name, email, rank, department_code):
         new_faculty = Faculty(
             name=name, email=email, rank=rank, department_code=department_code
         )
-        self.add(new_faculty)
+        return self.add(new_faculty)
 
     def add_program(self, name, department_code, in_charge_id):
         new_program = Program(
             name=name, department_code=department_code, in_charge_id=in_charge_id
         )
-        self.add(new_program)
+        return self.add(new_program)
 
     def add_course(self, id, title, description, department_code):
         new_course = Course(
             id=id, title=title, description=description, department_code=department_code
         )
-        self.add(new_course)
+        return self.add(new_course)
 
     def add_section(
         self, number, semester, year, course_id, instructor_id, enrollment_count
@@ -138,23 +1100,23 @@ class SessionManager:
             instructor_id=instructor_id,
             enrollment_count=enrollment_count,
         )
-        self.add(new_section)
+        return self.add(new_section)
 
     def add_learning_objective(self, id, description, parent_id=None):
         new_objective = LearningObjective(
             id=id, description=description, parent_id=parent_id
         )
-        self.add(new_objective)
+        return self.add(new_objective)
 
     def assign_course_to_program(self, program_id, course_id):
         new_assignment = ProgramCourses(program_id=program_id, course_id=course_id)
-        self.add(new_assignment)
+        return self.add(new_assignment)
 
     def assign_objective_to_course(self, course_id, objective_id, program_id):
         new_assignment = CourseObjectives(
             course_id=course_id, objective_id=objective_id, program_id=program_id
         )
-        self.add(new_assignment)
+        return self.add(new_assignment)
 
     def add_section_evaluation(
         self, section_id, objective_id, evaluation_method, students_met
@@ -165,106 +1127,346 @@ class SessionManager:
             evaluation_method=evaluation_method,
             students_met=students_met,
         )
-        self.add(new_evaluation)
-
-    def query(self, query):
-        return [[attr for attr in row] for row in self.session.execute(text(query))]
-
-    # List all of its programs
-    def get_department_programs_by_name(self, department_name):
-        return self.query(
-            f"SELECT p.name "
-            f"FROM departments AS d "
-            f"JOIN programs AS p "
-            f"ON d.code = p.department_code "
-            f"WHERE d.name= '{department_name}'"
+        with self.transaction():
+            self.add(new_evaluation)
+            self.refresh_summary([section_id])
+        return new_evaluation
+
+    # Bulk variants take iterables of tuples in the same order as the
+    # matching add_*/assign_* arguments
+    def bulk_add_departments(self, departments, batch_size=1000):
+        self.add_all(
+            Department,
+            (dict(name=name, code=code) for name, code in departments),
+            batch_size,
+        )
+
+    def bulk_add_faculty(self, faculty, batch_size=1000):
+        self.add_all(
+            Faculty,
+            (
+                dict(name=name, email=email, rank=rank, department_code=department_code)
+                for name, email, rank, department_code in faculty
+            ),
+            batch_size,
+        )
+
+    def bulk_add_programs(self, programs, batch_size=1000):
+        self.add_all(
+            Program,
+            (
+                dict(name=name, department_code=department_code, in_charge_id=in_charge_id)
+                for name, department_code, in_charge_id in programs
+            ),
+            batch_size,
+        )
+
+    def bulk_add_courses(self, courses, batch_size=1000):
+        self.add_all(
+            Course,
+            (
+                dict(id=id, title=title, description=description, department_code=department_code)
+                for id, title, description, department_code in courses
+            ),
+            batch_size,
+        )
+
+    # Sections may carry an explicit id as a 7th element so that evaluations
+    # in the same load can refer to them; either every section in a load
+    # does or none does, as executemany needs one set of columns
+    def bulk_add_sections(self, sections, batch_size=1000):
+        def rows():
+            with_id = None
+            for section in sections:
+                if with_id is None:
+                    with_id = len(section) > 6
+                elif with_id != (len(section) > 6):
+                    raise ValueError(
+                        "bulk_add_sections needs an id on every section or on none"
+                    )
+                number, semester, year, course_id, instructor_id, enrollment_count = section[:6]
+                row = dict(
+                    number=number,
+                    semester=semester,
+                    year=year,
+                    course_id=course_id,
+                    instructor_id=instructor_id,
+                    enrollment_count=enrollment_count,
+                )
+                if len(section) > 6:
+                    row["id"] = section[6]
+                yield row
+
+        self.add_all(Section, rows(), batch_size)
+
+    def bulk_add_learning_objectives(self, objectives, batch_size=1000):
+        self.add_all(
+            LearningObjective,
+            (
+                dict(id=id, description=description, parent_id=parent_id)
+                for id, description, parent_id in objectives
+            ),
+            batch_size,
+        )
+
+    def bulk_assign_courses_to_programs(self, assignments, batch_size=1000):
+        self.add_all(
+            ProgramCourses,
+            (
+                dict(program_id=program_id, course_id=course_id)
+                for program_id, course_id in assignments
+            ),
+            batch_size,
+        )
+
+    def bulk_assign_objectives_to_courses(self, assignments, batch_size=1000):
+        self.add_all(
+            CourseObjectives,
+            (
+                dict(course_id=course_id, objective_id=objective_id, program_id=program_id)
+                for course_id, objective_id, program_id in assignments
+            ),
+            batch_size,
+        )
+
+    def bulk_add_section_evaluations(self, evaluations, batch_size=1000):
+        section_ids = set()
+
+        def rows():
+            for section_id, objective_id, evaluation_method, students_met in evaluations:
+                section_ids.add(section_id)
+                yield dict(
+                    section_id=section_id,
+                    objective_id=objective_id,
+                    evaluation_method=evaluation_method,
+                    students_met=students_met,
+                )
+
+        with self.transaction():
+            self.add_all(SectionEvaluations, rows(), batch_size)
+            self.refresh_summary(section_ids)
+
+    # Recompute the evaluation_summary rows of the given sections from the
+    # raw tables, a few hundred sections per statement
+    def refresh_summary(self, section_ids, batch_size=500):
+        section_ids = list(section_ids)
+        try:
+            self.session.flush()
+            self.written(EvaluationSummary.__tablename__)
+            for start in range(0, len(section_ids), batch_size):
+                params = {"section_ids": section_ids[start : start + batch_size]}
+                self.session.execute(CLEAR_SUMMARY, params)
+                self.session.execute(REFRESH_SUMMARY, params)
+            self.commit()
+        except:
+            if not self.in_transaction:
+                self.session.rollback()
+            raise
+
+    def rebuild_summary(self):
+        with self.transaction():
+            self.written(EvaluationSummary.__tablename__)
+            self.session.execute(delete(EvaluationSummary.__table__))
+            self.session.execute(REBUILD_SUMMARY)
+
+    # Compare evaluation_summary with the raw tables. Returns the rows that
+    # are missing from the summary and the summary rows that are stale.
+    def check_summary(self):
+        expected = {tuple(row) for row in self.query(SUMMARY_SOURCE)}
+        actual = {
+            tuple(row)
+            for row in self.query(
+                select(*[EvaluationSummary.__table__.c[name] for name in SUMMARY_COLUMNS])
+            )
+        }
+        return sorted(expected - actual, key=str), sorted(actual - expected, key=str)
+
+    # Accepts raw SQL text or a prebuilt statement with its bound parameters.
+    # query, iter_query and page run on the primary unless given a session.
+    def query(self, query, params=None, session=None):
+        if isinstance(query, str):
+            query = text(query)
+        if session is None:
+            session = self.session
+        rows = [[attr for attr in row] for row in session.execute(query, params)]
+        self.query_stats.fetched(len(rows))
+        return rows
+
+    # Streaming variant of query: yields lists of at most chunk_size rows
+    # from a server-side cursor (on SQLite the cursor is already lazy), so
+    # large reports are consumed with bounded memory
+    def iter_query(self, query, params=None, chunk_size=1000, session=None):
+        if isinstance(query, str):
+            query = text(query)
+        if session is None:
+            session = self.session
+        result = session.execute(
+            query, params, execution_options={"stream_results": True}
+        )
+        try:
+            for partition in result.partitions(chunk_size):
+                self.query_stats.fetched(len(partition))
+                yield [[attr for attr in row] for row in partition]
+        finally:
+            result.close()
+
+    # Returns (rows, next_after) for one page of a report; pass next_after
+    # back to get the following page. next_after is None on the last page.
+    # Reports without page keys (the aggregates, whose window totals need
+    # every row) come back whole as a single page.
+    def page(self, statement, params, after=None, limit=100, session=None):
+        if statement not in REPORT_PAGES:
+            return self.query(statement, params, session), None
+        first, rest, width = REPORT_PAGES[statement]
+        params = dict(params, limit=limit)
+        if after is None:
+            rows = self.query(first, params, session)
+        else:
+            params.update((f"after_{i}", value) for i, value in enumerate(after))
+            rows = self.query(rest, params, session)
+        next_after = tuple(rows[-1][-width:]) if len(rows) == limit else None
+        return [row[:-width] for row in rows], next_after
+
+    # get_* methods return a list, a chunk iterator when stream=True, or one
+    # page as (rows, next_after) when limit is given. Lists and pages are
+    # served from the result cache when possible; reads inside a transaction
+    # or with uncommitted writes bypass the cache both ways. Results
+    # are cached apart by source, as a replica's may lag the primary's, and
+    # a thread within read_your_writes of its last write skips the cache.
+    def report(self, statement, params, stream=False, after=None, limit=None):
+        # The get_* method that called, for the query statistics
+        method = self.query_stats.method_codes.get(sys._getframe(1).f_code)
+        if stream and limit is None:
+            return self.query_stats.label_stream(
+                method,
+                self.read_stream(
+                    lambda session: self.iter_query(statement, params, session=session)
+                ),
+            )
+        recently_wrote = self.recently_wrote()
+        # Another thread's cached rows would not show this thread's
+        # uncommitted writes
+        uncommitted = self.in_transaction or bool(getattr(self.local, "written", None))
+        on_primary = not self.replicas or uncommitted or recently_wrote
+        key = (statement, tuple(sorted(params.items())), after, limit, on_primary)
+        if not (recently_wrote or uncommitted):
+            hit, result = self.cache.get(key)
+            if hit:
+                return result
+        generation = self.cache.generation
+        replica = None if on_primary else self.pick_replica()
+        with self.query_stats.label(method):
+            if limit is not None:
+                result = self.read_from(
+                    replica,
+                    lambda session: self.page(statement, params, after, limit, session),
+                )
+            else:
+                result = self.read_from(
+                    replica, lambda session: self.query(statement, params, session)
+                )
+        if not uncommitted:
+            self.cache.put(key, statement_tables(statement), result, generation)
+        return result
+
+    def get_department_programs_by_name(
+        self, department_name, stream=False, after=None, limit=None
+    ):
+        return self.report(
+            DEPARTMENT_PROGRAMS,
+            {"department_name": department_name},
+            stream,
+            after,
+            limit,
         )
 
-    # List all of its faculty (including what program each faculty is in charge of, if there is one)
-    def get_department_faculty_by_name(self, department_name):
-        return self.query(
-            f"SELECT f.name, p.name "
-            f"FROM departments AS d "
-            f"JOIN faculty AS f "
-            f"ON d.code = f.department_code "
-            f"LEFT JOIN programs AS p "
-            f"ON f.id = p.in_charge_id "
-            f"WHERE d.name = '{department_name}'"
+    def get_department_faculty_by_name(
+        self, department_name, stream=False, after=None, limit=None
+    ):
+        return self.report(
+            DEPARTMENT_FACULTY,
+            {"department_name": department_name},
+            stream,
+            after,
+            limit,
         )
 
-    # List all the courses, together with the objectives/sub-objectives association with year
-
-    def get_program_courses_by_name(self, program_name):
-        return self.query(
-            f"SELECT c.title, lo.description "
-            f"FROM courses AS c "
-            f"JOIN program_courses AS pc "
-            f"ON c.id = pc.course_id "
-            f"JOIN programs AS p "
-            f"ON p.id = pc.program_id "
-            f"LEFT JOIN course_objectives AS co "
-            f"ON co.course_id = c.id "
-            f"LEFT JOIN learning_objectives AS lo "
-            f"ON co.objective_id = lo.id "
-            f"WHERE p.name = '{program_name}'"
+    def get_program_courses_by_name(
+        self, program_name, stream=False, after=None, limit=None
+    ):
+        return self.report(
+            PROGRAM_COURSES, {"program_name": program_name}, stream, after, limit
         )
 
-    # List all of the objectives
-    def get_program_objectives_by_name(self, program_name):
-        return self.query(
-            f"SELECT DISTINCT lo.description "
-            f"FROM courses AS c "
-            f"JOIN program_courses AS pc "
-            f"ON c.id = pc.course_id "
-            f"JOIN programs AS p "
-            f"ON p.id = pc.program_id "
-            f"JOIN course_objectives AS co "
-            f"ON co.course_id = c.id "
-            f"JOIN learning_objectives AS lo "
-            f"ON co.objective_id = lo.id "
-            f"WHERE p.name = '{program_name}'"
+    def get_program_objectives_by_name(
+        self, program_name, stream=False, after=None, limit=None
+    ):
+        return self.report(
+            PROGRAM_OBJECTIVES, {"program_name": program_name}, stream, after, limit
         )
 
-    # List all of the evaluation results for each objective/sub-objective (If data for some sections has not been entered, indicate that information is not found)
-    def get_results_by_semester(self, semester, program_name):
+    def get_results_by_semester(
+        self, semester, program_name, stream=False, after=None, limit=None
+    ):
         semester = semester.split(" ")
-        return self.query(
-            f"SELECT c.title, s.number, se.evaluation_method, se.students_met "
-            f"FROM courses AS c "
-            f"JOIN sections AS s "
-            f"ON c.id = s.course_id "
-            f"JOIN program_courses AS pc "
-            f"ON c.id = pc.course_id "
-            f"JOIN programs AS p "
-            f"ON p.id = pc.program_id "
-            f"LEFT OUTER JOIN section_evaluations AS se "
-            f"ON s.id = se.section_id "
-            f"WHERE s.semester = '{semester[0]}' "  # semester[0] will contain "Fall" "Spring" etc
-            f"AND s.year = {semester[1]} "  # semester[1] will contain year (i.e. 23, 24, etc.)
-            f"AND p.name = '{program_name}'"
+        return self.report(
+            RESULTS_BY_SEMESTER,
+            {
+                "semester": semester[0],  # semester[0] will contain "Fall" "Spring" etc
+                "year": int(semester[1]),  # semester[1] will contain year (i.e. 23, 24, etc.)
+                "program_name": program_name,
+            },
+            stream,
+            after,
+            limit,
         )
 
-    # List all of the evaluation results for each objective/sub-objective
-    # Show course/section involved in evaluation, list result for each course/section, and aggregate the result to show the number (and percentage) of student
-    def get_results_by_year(self, year):
-        year = year.split("-")
-        return self.query(
-            f"SELECT lo.description, c.title, s.number, se.evaluation_method, se.students_met, ROUND(se.students_met * 100.0/s.enrollment_count) AS percent "
-            f"FROM courses AS c "
-            f"JOIN sections AS s "
-            f"ON c.id = s.course_id "
-            f"JOIN course_objectives AS co "
-            f"ON c.id = co.course_id "
-            f"JOIN learning_objectives AS lo "
-            f"ON co.objective_id = lo.id "
-            f"JOIN section_evaluations AS se "
-            f"ON s.id = se.section_id AND lo.id = se.objective_id "
-            f"WHERE (s.year = {year[0]} "
-            f"AND s.semester = 'Summer') "
-            f"OR (s.year = {year[0]} "
-            f"AND s.semester = 'Fall') "
-            f"OR (s.year = {year[1]} "
-            f"AND s.semester = 'Spring') "
-            f"GROUP BY lo.id, c.id, s.id, se.evaluation_method "
-            f"ORDER BY c.id, s.id"
+    def get_results_by_year(self, year, stream=False, after=None, limit=None):
+        return self.report(
+            RESULTS_BY_YEAR_SUMMARY,
+            {"first_year": first_year(year)},
+            stream,
+            after,
+            limit,
+        )
+
+    # Aggregate of get_results_by_year: one row per objective and course with
+    # its totals and percentage, plus the objective's and the year's overall
+    def get_aggregate_results_by_year(
+        self, year, stream=False, after=None, limit=None
+    ):
+        return self.report(
+            AGGREGATE_RESULTS_BY_YEAR,
+            {"first_year": first_year(year)},
+            stream,
+            after,
+            limit,
         )
+
+    # The objective and all of its sub-objectives, as (id, parent_id, depth,
+    # description) rows ordered by depth
+    def get_objective_subtree(self, objective_id):
+        return self.report(OBJECTIVE_SUBTREE, {"objective_id": objective_id})
+
+    # Like get_objective_subtree, with each node's students met, students
+    # evaluated and percent summed over its own subtree; pass an academic
+    # year such as "23-24" to count only that year
+    def get_rollup_for_objective(self, objective_id, year=None):
+        academic_year = first_year(year) if year else None
+        return self.report(
+            OBJECTIVE_ROLLUP,
+            {"objective_id": objective_id, "academic_year": academic_year},
+        )
+
+    # Department with its faculty and its programs, their courses and the
+    # courses' sections all loaded; None if there is no such department
+    def get_department_graph(self, department_name):
+        return self.read(
+            lambda session: session.scalars(
+                DEPARTMENT_GRAPH, {"department_name": department_name}
+            ).first()
+        )
+
+    # Every program with its courses and their sections loaded
+    def get_programs_graph(self):
+        return self.read(lambda session: session.scalars(PROGRAMS_GRAPH).all())
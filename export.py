@@ -0,0 +1,126 @@
+import argparse
+import csv
+import os
+import time
+
+from db import SessionManager
+
+# Column headings of the reports that are not in the GUI's query tabs (the
+# rest come from gui.QUERIES). These are bounded by the depth of the
+# objective tree and are fetched in one chunk; every other report streams
+# from a server-side cursor.
+UNSTREAMED = {
+    "get_objective_subtree": ["Objective ID", "Parent ID", "Depth", "Objective"],
+    "get_rollup_for_objective": [
+        "Objective ID",
+        "Parent ID",
+        "Depth",
+        "Objective",
+        "Students Met",
+        "Students Evaluated",
+        "Percent",
+    ],
+}
+FORMATS = {".csv": "csv", ".parquet": "parquet"}
+
+
+def write_csv(chunks, path, headings):
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(headings)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+    return rows
+
+
+# Each chunk becomes one Parquet row group, so only one chunk is held in
+# memory. pyarrow is only needed for this format and is imported here.
+def write_parquet(chunks, path, headings):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow: pip install pyarrow")
+
+    rows = 0
+    schema = None
+    writer = None
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            columns = list(zip(*chunk))
+            if writer is None:
+                # Column types come from the first chunk; a column that is
+                # all NULL there is written as text
+                types = [pa.array(column).type for column in columns]
+                types = [pa.string() if pa.types.is_null(t) else t for t in types]
+                schema = pa.schema(list(zip(headings, types)))
+                writer = pq.ParquetWriter(path, schema)
+            arrays = [
+                pa.array(
+                    [
+                        str(value)
+                        if value is not None and pa.types.is_string(t)
+                        else value
+                        for value in column
+                    ],
+                    type=t,
+                )
+                for column, t in zip(columns, schema.types)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            rows += len(chunk)
+        if writer is None:
+            schema = pa.schema([(heading, pa.string()) for heading in headings])
+            pq.write_table(schema.empty_table(), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+WRITERS = {"csv": write_csv, "parquet": write_parquet}
+
+
+def export_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Export to .csv or .parquet, not {extension or path!r}")
+    return FORMATS[extension]
+
+
+# Write one get_* report to path, as CSV or Parquet by its extension.
+# Returns the number of rows written and the seconds it took.
+def export_report(db, method, args, path, headings, format=None):
+    format = format or export_format(path)
+    start = time.perf_counter()
+    if method in UNSTREAMED:
+        chunks = [getattr(db, method)(*args)]
+    else:
+        chunks = getattr(db, method)(*args, stream=True)
+    rows = WRITERS[format](chunks, path, headings)
+    return rows, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    from gui import QUERIES
+
+    exports = {method: headings for method, fields, headings in QUERIES.values()}
+    exports.update(UNSTREAMED)
+
+    parser = argparse.ArgumentParser(description="Export a report to CSV or Parquet")
+    parser.add_argument("url", help="database URL, e.g. sqlite:///university_evaluation.db")
+    parser.add_argument("report", choices=exports)
+    parser.add_argument("args", nargs="*", help="the report's arguments, e.g. 23-24")
+    parser.add_argument("--output", required=True, help="file ending in .csv or .parquet")
+    args = parser.parse_args()
+
+    db = SessionManager(args.url)
+    rows, seconds = export_report(
+        db, args.report, args.args, args.output, exports[args.report]
+    )
+    rate = rows / seconds if seconds else 0
+    print(f"exported {rows} rows to {args.output} in {seconds:.2f}s ({rate:.0f} rows/s)")
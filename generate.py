@@ -0,0 +1,184 @@
+import argparse
+import random
+import time
+
+from db import SectionEvaluations, SessionManager
+from gui import reset_database
+
+# Rows generated per parent: departments, then per department faculty and
+# programs, per program courses, per course objectives and sections. Every
+# section gets one evaluation per objective of its course, which makes
+# about 200 evaluations at small, 50k at medium, 1M at large, 6M at xlarge.
+SCALES = {
+    "small": dict(
+        departments=2, faculty=8, programs=3, courses=3, objectives=2, sections=6
+    ),
+    "medium": dict(
+        departments=5, faculty=40, programs=6, courses=10, objectives=4, sections=40
+    ),
+    "large": dict(
+        departments=10, faculty=100, programs=10, courses=20, objectives=5, sections=100
+    ),
+    "xlarge": dict(
+        departments=20, faculty=200, programs=10, courses=25, objectives=6, sections=200
+    ),
+}
+SEMESTERS = ["Fall", "Spring", "Summer"]
+YEARS = [21, 22, 23, 24, 25]
+METHODS = ["Exam", "Homework", "Participation", "Project"]
+RANKS = ["full", "associate", "assistant", "adjunct"]
+
+
+def department_code(d):
+    return f"D{d:03d}"
+
+
+def department_name(d):
+    return f"Department {d}"
+
+
+def program_name(d, p):
+    return f"Program {d}-{p}"
+
+
+# Load a synthetic university into db. The same seed always produces the
+# same data; rows are streamed into the bulk loaders so memory stays flat
+# at any scale. Returns the number of rows written per table.
+def generate_data(db, scale="small", seed=0, batch_size=5000, **sizes):
+    sizes = dict(SCALES[scale], **sizes)
+    rng = random.Random(seed)
+
+    departments = range(1, sizes["departments"] + 1)
+    faculty_ids = {}
+    programs = []  # (program_id, department)
+    courses = []  # (course_id, program_id)
+    for d in departments:
+        first = (d - 1) * sizes["faculty"] + 1
+        faculty_ids[d] = range(first, first + sizes["faculty"])
+        for p in range(1, sizes["programs"] + 1):
+            program_id = len(programs) + 1
+            programs.append((program_id, d))
+            for c in range(1, sizes["courses"] + 1):
+                course_id = f"{department_code(d)}-{program_id:03d}{c:02d}"
+                courses.append((course_id, program_id))
+    program_department = dict(programs)
+
+    def objective_ids(course_id):
+        return [f"{course_id}-{k}" for k in range(1, sizes["objectives"] + 1)]
+
+    # Sections are streamed twice, once to insert them and once to derive
+    # their evaluations, from identically seeded generators so neither
+    # pass has to hold them all in memory
+    def sections():
+        rng = random.Random(f"{seed}-sections")
+        section_id = 0
+        for course_id, program_id in courses:
+            d = program_department[program_id]
+            for n in range(1, sizes["sections"] + 1):
+                section_id += 1
+                yield (
+                    n,
+                    rng.choice(SEMESTERS),
+                    rng.choice(YEARS),
+                    course_id,
+                    rng.choice(faculty_ids[d]),
+                    rng.randint(5, 60),
+                    section_id,
+                )
+
+    def evaluations():
+        rng = random.Random(f"{seed}-evaluations")
+        for section in sections():
+            course_id, enrollment, section_id = section[3], section[5], section[6]
+            for objective_id in objective_ids(course_id):
+                yield dict(
+                    section_id=section_id,
+                    objective_id=objective_id,
+                    evaluation_method=rng.choice(METHODS),
+                    students_met=rng.randint(0, enrollment),
+                )
+
+    with db.transaction():
+        db.bulk_add_departments(
+            (department_name(d), department_code(d)) for d in departments
+        )
+        db.bulk_add_faculty(
+            (
+                f"Faculty {i}",
+                f"faculty{i}@example.edu",
+                rng.choice(RANKS),
+                department_code(d),
+            )
+            for d in departments
+            for i in faculty_ids[d]
+        )
+        db.bulk_add_programs(
+            (
+                program_name(d, p),
+                department_code(d),
+                rng.choice(faculty_ids[d]),
+            )
+            for d in departments
+            for p in range(1, sizes["programs"] + 1)
+        )
+        db.bulk_add_courses(
+            (
+                course_id,
+                f"Course {course_id}",
+                f"Synthetic course {course_id}",
+                department_code(program_department[program_id]),
+            )
+            for course_id, program_id in courses
+        )
+        db.bulk_assign_courses_to_programs(
+            (program_id, course_id) for course_id, program_id in courses
+        )
+        # The first objective of a course is top-level, the rest are its
+        # sub-objectives
+        db.bulk_add_learning_objectives(
+            (objective_id, f"Objective {objective_id}", None if k == 0 else ids[0])
+            for course_id, program_id in courses
+            for ids in [objective_ids(course_id)]
+            for k, objective_id in enumerate(ids)
+        )
+        db.bulk_assign_objectives_to_courses(
+            (course_id, objective_id, program_id)
+            for course_id, program_id in courses
+            for objective_id in objective_ids(course_id)
+        )
+
+        db.bulk_add_sections(sections(), batch_size)
+        db.add_all(SectionEvaluations, evaluations(), batch_size)
+        # Recomputing the summary once is cheaper than per-section refreshes
+        db.rebuild_summary()
+
+    total_courses = len(courses)
+    counts = {}
+    counts["departments"] = sizes["departments"]
+    counts["faculty"] = sizes["departments"] * sizes["faculty"]
+    counts["programs"] = len(programs)
+    counts["courses"] = total_courses
+    counts["program_courses"] = total_courses
+    counts["learning_objectives"] = total_courses * sizes["objectives"]
+    counts["course_objectives"] = total_courses * sizes["objectives"]
+    counts["sections"] = total_courses * sizes["sections"]
+    counts["section_evaluations"] = counts["sections"] * sizes["objectives"]
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load synthetic evaluation data")
+    parser.add_argument("url", help="database URL, e.g. sqlite:///synthetic.db")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    db = SessionManager(args.url)
+    reset_database(db.engine)
+    start = time.perf_counter()
+    counts = generate_data(db, args.scale, args.seed)
+    elapsed = time.perf_counter() - start
+    rows = sum(counts.values())
+    print(f"loaded {rows} rows in {elapsed:.2f}s ({rows / elapsed:.0f} rows/s)")
+    for table, count in counts.items():
+        print(f"{table:22} {count}")
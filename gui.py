@@ -1,58 +1,85 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from sqlalchemy import create_engine
-from db import Base
+from tkinter import ttk, messagebox, filedialog
+from sqlalchemy import Integer, create_engine
+from db import (
+    LATENCY_BUCKETS,
+    SCHEMA_VERSION,
+    Base,
+    Course,
+    CourseObjectives,
+    Department,
+    Faculty,
+    LearningObjective,
+    ProgramCourses,
+    Program,
+    Section,
+    SectionEvaluations,
+    set_schema_version,
+)
+from export import export_report
 from random import random
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import copy
+import time
 
 DB = None
 
+# Database calls run on this pool so the Tk mainloop never waits on MySQL
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+POLL_INTERVAL_MS = 50
+# Latest running task per key, as (future, on_cancel); submitting again
+# under the same key supersedes the previous task, whose result is then
+# dropped
+TASKS = {}
+# Fields are re-validated this long after the last keystroke in them
+DEBOUNCE_MS = 150
 
-# Validation functions
-def validate_non_empty(entry):
-    return entry.get().strip() != ""
 
+# Validation functions; each takes the stripped text of one field
+def validate_non_empty(value):
+    return value != ""
 
-def validate_department_code(entry):
-    return len(entry.get().strip()) <= 4 and entry.get().strip().isalnum()
 
+def validate_department_code(value):
+    return len(value) <= 4 and value.isalnum()
 
-def validate_email(entry):
-    return "@" in entry.get().strip() and "." in entry.get().strip()
 
+def validate_email(value):
+    return "@" in value and "." in value
 
-def validate_course_id(entry):
-    return entry.get().strip() != ""
 
+def validate_course_id(value):
+    return value != ""
 
-def validate_section_id(entry):
-    return entry.get().strip().isdigit() and len(entry.get().strip()) <= 3
 
+def validate_section_id(value):
+    return value.isdigit() and len(value) <= 3
 
-def validate_department_id(entry):
-    return entry.get().strip().isdigit()
 
+def validate_department_id(value):
+    return value.isdigit()
 
-def validate_person_in_charge_id(entry):
-    return entry.get().strip().isdigit()
 
+def validate_person_in_charge_id(value):
+    return value.isdigit()
 
-def validate_enrollment_count(entry):
-    return entry.get().strip().isdigit()
 
+def validate_enrollment_count(value):
+    return value.isdigit()
 
-def validate_department_name(entry):
-    return entry.get().strip() != ""
 
+def validate_department_name(value):
+    return value != ""
 
-def validate_program_name(entry):
-    return entry.get().strip() != ""
 
+def validate_program_name(value):
+    return value != ""
 
-def validate_year(entry):
-    return entry.get().strip() != "" and len(entry.get().strip(
-    )) == 5 and entry.get().strip()[0:2].isdigit() and entry.get().strip(
-    )[3:5].isdigit() and entry.get().strip()[2] == "-"
+
+def validate_year(value):
+    return len(value) == 5 and value[0:2].isdigit() and value[3:5].isdigit(
+    ) and value[2] == "-" and int(value[3:5]) == (int(value[0:2]) + 1) % 100
 
 
 validation_functions = {
@@ -67,328 +94,430 @@ validation_functions = {
     "Year": validate_year,
 }
 
+# Extra rules for data-entry columns, on top of the column's type and length
+column_validation_functions = {
+    "code": validate_department_code,
+    "department_code": validate_department_code,
+    "email": validate_email,
+    "number": validate_section_id,
+    "in_charge_id": validate_person_in_charge_id,
+    "enrollment_count": validate_enrollment_count,
+}
 
-def set_entry_validity(entry, is_valid):
-    if is_valid:
-        entry.config(foreground="black")
-    else:
-        entry.config(foreground="red")
+# A form field: the validator and converter are compiled once per field so
+# a keystroke only runs the checks that apply to it
+Field = namedtuple("Field",
+                   ["label", "name", "validator", "convert", "choices"])
+
+
+def compile_validator(checks, required=True):
+    def validator(value):
+        if not validate_non_empty(value):
+            return not required
+        return all(check(value) for check in checks)
+
+    return validator
+
+
+def query_field(label, choices=None):
+    checks = []
+    if label in validation_functions:
+        checks.append(validation_functions[label])
+    return Field(label, label, compile_validator(checks), str, choices)
+
+
+# Data-entry forms are generated from the models in db.py:
+# tab text, model, SessionManager writer (whose arguments are the column
+# names), and the optional columns
+DATA_FORMS = [
+    ("Departments", Department, "add_department", ()),
+    ("Faculty", Faculty, "add_faculty", ()),
+    ("Programs", Program, "add_program", ()),
+    ("Courses", Course, "add_course", ()),
+    ("Sections", Section, "add_section", ()),
+    ("Learning Objectives", LearningObjective, "add_learning_objective",
+     ("parent_id", )),
+    ("Assign Course to Program", ProgramCourses, "assign_course_to_program",
+     ()),
+    ("Assign Objectives", CourseObjectives, "assign_objective_to_course", ()),
+    ("Section Evaluation", SectionEvaluations, "add_section_evaluation", ()),
+]
+FIELD_LABELS = {
+    "in_charge_id": "Person in Charge ID",
+    "parent_id": "Parent Objective ID",
+}
+FIELD_CHOICES = {
+    "rank": ["full", "associate", "assistant", "adjunct"],
+    "semester": ["Fall", "Spring", "Summer"],
+}
 
 
-def check_entries(entries, submit_button):
-    all_valid = True
-    for field, entry in entries.items():
-        is_valid = validate_non_empty(entry) and validation_functions.get(
-            field, lambda e: True)(entry)
-        set_entry_validity(entry, is_valid)
-        all_valid &= is_valid
-    submit_button.config(state="normal" if all_valid else "disabled")
+def model_fields(model, optional=()):
+    fields = []
+    table = model.__table__
+    for column in table.columns:
+        # Surrogate keys are assigned by the database
+        if column.primary_key and len(table.primary_key.columns) == 1 and \
+                isinstance(column.type, Integer) and not column.foreign_keys:
+            continue
+        label = FIELD_LABELS.get(
+            column.name,
+            column.name.replace("_", " ").title().replace("Id", "ID"))
+        checks = []
+        if isinstance(column.type, Integer):
+            checks.append(str.isdigit)
+            convert = int
+        else:
+            convert = str
+        length = getattr(column.type, "length", None)
+        if length:
+            checks.append(lambda value, length=length: len(value) <= length)
+        if column.name in column_validation_functions:
+            checks.append(column_validation_functions[column.name])
+        required = column.name not in optional
+        fields.append(
+            Field(label, column.name, compile_validator(checks, required),
+                  convert, FIELD_CHOICES.get(column.name)))
+    return fields
 
 
-def handle_data_submission(entries, status_label, category):
-    is_valid = all(validate_non_empty(entry) for entry in entries.values())
+def set_entry_validity(entry, is_valid):
     if is_valid:
-        data = {field: entry.get() for field, entry in entries.items()}
-        try:
-            if category == "Departments":
-                DB.add_department(data["Name"], data["Code"])
-            elif category == "Faculty":
-                DB.add_faculty(data["Name"], data["Email"], data["Rank"],
-                               data["Code"])
-            elif category == "Programs":
-                DB.add_program(data["Name"], data["Code"],
-                               data["Person in Charge ID"])
-            elif category == "Courses":
-                DB.add_course(data["ID"], data["Title"],
-                               data["Description"], data["Code"])
-            # Add similar branches for other categories
-            status_label.config(
-                text=f"Data for {category} successfully submitted.",
-                fg="green")
-        except Exception as e:
-            status_label.config(text=str(e), fg="red")
+        entry.config(foreground="black")
     else:
-        status_label.config(text="Invalid data in some fields.", fg="red")
+        entry.config(foreground="red")
 
 
-def add_data_fields(tab, field_names, validation_functions, status_label,
-                    category):
+# Build a form for fields. Each entry re-validates only itself, DEBOUNCE_MS
+# after the user stops typing in it; on_submit receives the converted
+# values keyed by field name once every field is valid.
+def add_form_fields(tab,
+                    fields,
+                    status_label,
+                    on_submit,
+                    submit_text="Submit"):
     entries = {}
-    for field in field_names:
-        frame = tk.Frame(tab)
-        frame.pack(side="top", fill="x", padx=5, pady=5)
-
-        label = tk.Label(frame, text=field, width=20)
-        label.pack(side="left")
-
-        entry = tk.Entry(frame)
-        entry.pack(side="right", expand=True, fill="x")
-        entry.bind(
-            "<KeyRelease>",
-            lambda event, e=entry: check_entries(entries, submit_button))
-        entries[field] = entry
-
-    submit_button = tk.Button(
-        tab,
-        text="Submit",
-        state="disabled",
-        command=lambda: handle_data_submission(entries, status_label, category
-                                               ),
-    )
-    submit_button.pack(pady=10)
-
-    check_entries(entries, submit_button)
-
-    return entries
-
-
-def handle_query_submission(entries, status_label, category):
-    is_valid = all(validate_non_empty(entry) for entry in entries.values())
-    if is_valid:
-        data = {field: entry.get() for field, entry in entries.items()}
-        try:
-            results = ""
-
-            if category == "Department":
-                if data["Choice"] == "faculty":
-                    results = DB.get_department_faculty_by_name(
-                        data["Department Name"])
-                elif data["Choice"] == "program":
-                    results = DB.get_department_programs_by_name(
-                        data["Department Name"])
-            elif category == "Program":
-                if data["Choice"] == "courses":
-                    results = DB.get_program_courses_by_name(
-                        data["Program Name"])
-                elif data["Choice"] == "objectives":
-                    results = DB.get_program_objectives_by_name(
-                        data["Program Name"])
-            elif category == "Semester Program":
-                if data["Choice"] == "evaluation":
-                    results = DB.get_results_by_semester(
-                        data["Semester"], data["Program Name"])
-            elif category == "Year":
-                if data["Choice"] == "evaluation":
-                    results = DB.get_results_by_year(data["Year"])
-
-            final = '\n'.join([str(result) for result in results])
-            status_label.config(
-                text=f"Query for {category} successfully submitted.\n{final}",
-                fg="green")
-        except Exception as e:
-            status_label.config(text=str(e), fg="red")
-    else:
-        status_label.config(text="Invalid data in some fields.", fg="red")
-
+    valid = {}
+    pending = {}
+
+    def validate(field):
+        pending.pop(field.name, None)
+        entry = entries[field.name]
+        is_valid = field.validator(entry.get().strip())
+        valid[field.name] = is_valid
+        set_entry_validity(entry, is_valid)
+        submit_button.config(
+            state="normal" if all(valid.values()) else "disabled")
+
+    def schedule(field):
+        job = pending.pop(field.name, None)
+        if job is not None:
+            tab.after_cancel(job)
+        pending[field.name] = tab.after(DEBOUNCE_MS, validate, field)
+
+    def submit():
+        # Validate anything still waiting on its debounce first
+        for field in fields:
+            if field.name in pending:
+                tab.after_cancel(pending[field.name])
+                validate(field)
+        if not all(valid.values()):
+            status_label.config(text="Invalid data in some fields.", fg="red")
+            return
+        values = {}
+        for field in fields:
+            value = entries[field.name].get().strip()
+            values[field.name] = field.convert(value) if value else None
+        on_submit(values)
 
-def add_query_fields(tab, field_names, validation_functions, status_label,
-                     category):
-    entries = {}
-    for field in field_names:
+    for field in fields:
         frame = tk.Frame(tab)
         frame.pack(side="top", fill="x", padx=5, pady=5)
 
-        label = tk.Label(frame, text=field, width=20)
+        label = tk.Label(frame, text=field.label, width=20)
         label.pack(side="left")
 
-        if field == "Choice":
+        if field.choices:
             choice_var = tk.StringVar()
-            choice_options = ["default"]
-            if category == "Department":
-                choice_options = ["faculty", "program"]
-            elif category == "Program":
-                choice_options = ["courses", "objectives"]
-            elif category == "Semester Program":
-                choice_options = ["evaluation"]
-            elif category == "Year":
-                choice_options = ["evaluation"]
             choice_dropdown = ttk.Combobox(frame,
                                            textvariable=choice_var,
-                                           values=choice_options,
+                                           values=field.choices,
                                            state="readonly")
-            choice_dropdown.set(choice_options[0])
+            choice_dropdown.set(field.choices[0])
             choice_dropdown.pack(side="right", expand=True, fill="x")
-            entries[field] = choice_dropdown
-        else:
-            entry = tk.Entry(frame)
-            entry.pack(side="right", expand=True, fill="x")
-            entry.bind(
-                "<KeyRelease>",
-                lambda event, e=entry: check_entries(entries, submit_button))
-            entries[field] = entry
-
-    submit_button = tk.Button(
-        tab,
-        text="Submit",
-        state="disabled",
-        command=lambda: handle_query_submission(entries, status_label, category
-                                                ),
-    )
-    submit_button.pack(pady=10)
-
-    check_entries(entries, submit_button)
-
-    return entries
-
-
-def add_faculty_fields(tab, field_names, validation_functions, status_label):
-    entries = {}
-    for field in field_names:
-        frame = tk.Frame(tab)
-        frame.pack(side="top", fill="x", padx=5, pady=5)
-
-        label = tk.Label(frame, text=field, width=20)
-        label.pack(side="left")
-
-        if field == "Rank":
-            rank_var = tk.StringVar()
-            rank_options = ["full", "associate", "assistant", "adjunct"]
-            rank_dropdown = ttk.Combobox(frame,
-                                         textvariable=rank_var,
-                                         values=rank_options,
-                                         state="readonly")
-            rank_dropdown.set(rank_options[0])
-            rank_dropdown.pack(side="right", expand=True, fill="x")
-            entries[field] = rank_dropdown
+            entries[field.name] = choice_dropdown
+            valid[field.name] = True
         else:
             entry = tk.Entry(frame)
             entry.pack(side="right", expand=True, fill="x")
-            entry.bind(
-                "<KeyRelease>",
-                lambda event, e=entry: check_entries(entries, submit_button))
-            entries[field] = entry
+            entry.bind("<KeyRelease>", lambda event, f=field: schedule(f))
+            entries[field.name] = entry
 
     submit_button = tk.Button(tab,
-                              text="Submit",
+                              text=submit_text,
                               state="disabled",
-                              command=lambda: handle_data_submission(
-                                  entries, status_label, "Faculty"))
+                              command=submit)
     submit_button.pack(pady=10)
 
-    check_entries(entries, submit_button)
+    for field in fields:
+        if not field.choices:
+            validate(field)
 
     return entries
 
 
-def handle_course_program_assignment(entries, status_label):
-    is_valid = all(validate_non_empty(entry) for entry in entries.values())
-    if is_valid:
-        data = {field: entry.get() for field, entry in entries.items()}
-        try:
-            DB.assign_course_to_program(int(data["Program ID"]), data["Course ID"])
-            status_label.config(
-                text="Course successfully assigned to program.", fg="green")
-        except Exception as e:
-            status_label.config(text=str(e), fg="red")
-    else:
-        status_label.config(text="Invalid data in some fields.", fg="red")
-
+def update_busy_state(widget):
+    widget.winfo_toplevel().config(cursor="watch" if TASKS else "")
 
-def add_course_program_assignment_fields(tab, validation_functions,
-                                         status_label):
-    entries = {}
-    fields = ["Program ID", "Course ID"]
-    for field in fields:
-        frame = tk.Frame(tab)
-        frame.pack(side="top", fill="x", padx=5, pady=5)
-        label = tk.Label(frame, text=field, width=20)
-        label.pack(side="left")
-        entry = tk.Entry(frame)
-        entry.pack(side="right", expand=True, fill="x")
-        entry.bind(
-            "<KeyRelease>",
-            lambda event, e=entry: check_entries(entries, submit_button))
-        entries[field] = entry
-
-    submit_button = tk.Button(tab,
-                              text="Assign",
-                              state="disabled",
-                              command=lambda: handle_course_program_assignment(
-                                  entries, status_label))
-    submit_button.pack(pady=10)
-    check_entries(entries, submit_button)
-
-
-def handle_objective_assignment(entries, status_label):
-    is_valid = all(validate_non_empty(entry) for entry in entries.values())
-    if is_valid:
-        data = {field: entry.get() for field, entry in entries.items()}
-        try:
-            DB.assign_objective_to_course(data["Course ID"],
-                                          data["Objective ID"],
-                                          data["Program ID"])
-            status_label.config(text="Objective successfully assigned.",
-                                fg="green")
-        except Exception as e:
-            status_label.config(text=str(e), fg="red")
-    else:
-        status_label.config(text="Invalid data in some fields.", fg="red")
 
+def run_task(fn):
+    try:
+        return fn()
+    finally:
+        DB.remove()  # hand the worker's connection back to the pool
 
-def add_objective_assignment_fields(tab, validation_functions, status_label):
-    entries = {}
-    fields = ["Course ID", "Objective ID", "Program ID"]
-    for field in fields:
-        frame = tk.Frame(tab)
-        frame.pack(side="top", fill="x", padx=5, pady=5)
-        label = tk.Label(frame, text=field, width=20)
-        label.pack(side="left")
-        entry = tk.Entry(frame)
-        entry.pack(side="right", expand=True, fill="x")
-        entry.bind(
-            "<KeyRelease>",
-            lambda event, e=entry: check_entries(entries, submit_button))
-        entries[field] = entry
-
-    submit_button = tk.Button(
-        tab,
-        text="Assign",
-        state="disabled",
-        command=lambda: handle_objective_assignment(entries, status_label))
-    submit_button.pack(pady=10)
-    check_entries(entries, submit_button)
 
+# Run fn on the executor and call on_success/on_error with its outcome on
+# the Tk thread. Tk widgets must only be touched from the mainloop, so the
+# future is polled with after() rather than called back from the worker.
+def submit_task(widget, fn, on_success, on_error, key=None, on_cancel=None):
+    if key is None:
+        key = object()
+    future = EXECUTOR.submit(run_task, fn)
+    TASKS[key] = (future, on_cancel)
+    update_busy_state(widget)
 
-def handle_evaluation_submission(entries, status_label):
-    is_valid = all(validate_non_empty(entry) for entry in entries.values())
-    if is_valid:
-        data = {field: entry.get() for field, entry in entries.items()}
+    def poll():
+        if TASKS.get(key, (None, ))[0] is not future:
+            return
+        if not future.done():
+            widget.after(POLL_INTERVAL_MS, poll)
+            return
+        del TASKS[key]
+        update_busy_state(widget)
         try:
-            DB.add_section_evaluation(data["Section ID"], data["Objective ID"],
-                                      data["Evaluation Method"],
-                                      int(data["Students Met"]))
-            status_label.config(
-                text="Evaluation result successfully submitted.", fg="green")
+            result = future.result()
         except Exception as e:
-            status_label.config(text=str(e), fg="red")
-    else:
-        status_label.config(text="Invalid data in some fields.", fg="red")
-
-
-def add_evaluation_fields(tab, validation_functions, status_label):
-    entries = {}
-    fields = [
-        "Section ID", "Objective ID", "Evaluation Method", "Students Met"
-    ]
-    for field in fields:
-        frame = tk.Frame(tab)
-        frame.pack(side="top", fill="x", padx=5, pady=5)
-        label = tk.Label(frame, text=field, width=20)
-        label.pack(side="left")
-        entry = tk.Entry(frame)
-        entry.pack(side="right", expand=True, fill="x")
-        entry.bind(
-            "<KeyRelease>",
-            lambda event, e=entry: check_entries(entries, submit_button))
-        entries[field] = entry
-
-    submit_button = tk.Button(
-        tab,
-        text="Submit",
-        state="disabled",
-        command=lambda: handle_evaluation_submission(entries, status_label))
-    submit_button.pack(pady=10)
-    check_entries(entries, submit_button)
+            on_error(e)
+        else:
+            on_success(result)
+
+    widget.after(POLL_INTERVAL_MS, poll)
+    return future
+
+
+# A query already running on the server cannot be interrupted, but its
+# result is discarded and the UI is freed immediately
+def cancel_task(key, status_label):
+    future, on_cancel = TASKS.pop(key, (None, None))
+    if future is not None:
+        future.cancel()
+        if on_cancel is not None:
+            on_cancel()
+        status_label.config(text="Query cancelled.", fg="red")
+    update_busy_state(status_label)
+
+
+def show_error(status_label):
+    return lambda e: status_label.config(text=str(e), fg="red")
+
+
+def handle_data_submission(values, status_label, category, method):
+    status_label.config(text=f"Submitting {category}...", fg="blue")
+    submit_task(
+        status_label, lambda: getattr(DB, method)(**values),
+        lambda result: status_label.config(
+            text=f"Data for {category} successfully submitted.", fg="green"),
+        show_error(status_label))
+
+
+# (category, choice) -> SessionManager report, the form fields passed to it
+# and the result grid's column headings
+QUERIES = {
+    ("Department", "faculty"):
+    ("get_department_faculty_by_name", ["Department Name"],
+     ["Faculty", "Program in Charge"]),
+    ("Department", "program"):
+    ("get_department_programs_by_name", ["Department Name"], ["Program"]),
+    ("Program", "courses"):
+    ("get_program_courses_by_name", ["Program Name"],
+     ["Course", "Objective"]),
+    ("Program", "objectives"):
+    ("get_program_objectives_by_name", ["Program Name"], ["Objective"]),
+    ("Semester Program", "evaluation"):
+    ("get_results_by_semester", ["Semester", "Program Name"],
+     ["Course", "Section", "Evaluation Method", "Students Met"]),
+    ("Year", "evaluation"):
+    ("get_results_by_year", ["Year"], [
+        "Objective", "Course", "Section", "Evaluation Method",
+        "Students Met", "Percent"
+    ]),
+    ("Year", "aggregate"):
+    ("get_aggregate_results_by_year", ["Year"], [
+        "Objective", "Course", "Students Met", "Students Evaluated",
+        "Percent", "Objective Met", "Objective Evaluated",
+        "Objective Percent", "Overall Percent"
+    ]),
+}
+PAGE_SIZE = 100
+MAX_PAGES = 3  # pages kept in the result grid at once
+
+
+# Result grid: rows are fetched a page at a time with keyset pagination as
+# the user scrolls, and only MAX_PAGES pages around the visible rows are
+# kept in the Treeview, so showing and scrolling a report costs the same
+# however many rows it has. The keyset bound of every page seen is kept,
+# so pages dropped off either end are fetched again on scrolling back.
+def setup_result_view(window, status_label):
+    frame = tk.Frame(window)
+    frame.pack(expand=True, fill="both", padx=10, pady=(0, 10))
+
+    tree = ttk.Treeview(frame, show="headings", height=12)
+    scrollbar = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+    tree.pack(side="left", expand=True, fill="both")
+    scrollbar.pack(side="right", fill="y")
+
+    view = {
+        "tree": tree,
+        "status_label": status_label,
+        "category": None,
+        "report": None,
+        "fetch": None,
+        "keys": [None],  # page number -> after key that fetches it
+        "first": 0,  # page number of the first page in the tree
+        "pages": [],  # item ids of each page in the tree
+        "loading": False,
+    }
+
+    def on_scroll(first, last):
+        scrollbar.set(first, last)
+        if float(last) > 0.9:
+            fetch_page(view, view["first"] + len(view["pages"]))
+        elif float(first) < 0.1 and view["first"] > 0:
+            fetch_page(view, view["first"] - 1)
+
+    tree.config(yscrollcommand=on_scroll)
+    return view
+
+
+def show_report(view, category, method, args, headings):
+    tree = view["tree"]
+    tree.delete(*tree.get_children())
+    columns = [str(i) for i in range(len(headings))]
+    tree.config(columns=columns)
+    for column, heading in zip(columns, headings):
+        tree.heading(column, text=heading)
+
+    def fetch(after):
+        return getattr(DB, method)(*args, after=after, limit=PAGE_SIZE)
+
+    view.update(category=category,
+                report=(method, args, headings),
+                fetch=fetch,
+                keys=[None],
+                first=0,
+                pages=[],
+                loading=False)
+    fetch_page(view, 0)
+
+
+# Fetch page number index and add it above or below the pages in the tree,
+# dropping the page at the far end when there are more than MAX_PAGES
+def fetch_page(view, index):
+    if view["loading"] or view["fetch"] is None or index >= len(view["keys"]):
+        return
+    view["loading"] = True
+    fetch, after = view["fetch"], view["keys"][index]
+    tree, pages = view["tree"], view["pages"]
+    status_label = view["status_label"]
+
+    def show_page(page):
+        rows, next_after = page
+        if index + 1 == len(view["keys"]) and next_after is not None:
+            view["keys"].append(next_after)
+        # Keep the same rows in sight as pages come and go above them
+        top = round(float(tree.yview()[0]) * len(tree.get_children()))
+        values = [["" if v is None else v for v in row] for row in rows]
+        if index < view["first"]:
+            items = [
+                tree.insert("", i, values=row) for i, row in enumerate(values)
+            ]
+            pages.insert(0, items)
+            view["first"] = index
+            top += len(values)
+            if len(pages) > MAX_PAGES:
+                tree.delete(*pages.pop())
+        else:
+            pages.append([tree.insert("", "end", values=row) for row in values])
+            if len(pages) > MAX_PAGES:
+                dropped = pages.pop(0)
+                tree.delete(*dropped)
+                view["first"] += 1
+                top -= len(dropped)
+        shown = len(tree.get_children())
+        if shown:
+            tree.yview_moveto(max(top, 0) / shown)
+        view["loading"] = False
+
+        start = view["first"] * PAGE_SIZE
+        more = ""
+        if view["first"] + len(pages) < len(view["keys"]):
+            more = " (scroll for more)"
+        status_label.config(
+            text=f"Query for {view['category']} successfully submitted: "
+            f"showing rows {start + 1 if shown else 0}-{start + shown}{more}.",
+            fg="green")
+
+    def show_failure(e):
+        view.update(loading=False, fetch=None)
+        status_label.config(text=str(e), fg="red")
+
+    # A new query supersedes a page fetch that is still running
+    status_label.config(text=f"Running query for {view['category']}...",
+                        fg="blue")
+    # Cancelling leaves the page out; scrolling fetches it again
+    submit_task(tree,
+                lambda: fetch(after),
+                show_page,
+                show_failure,
+                key="query",
+                on_cancel=lambda: view.update(loading=False))
+
+
+def handle_query_submission(values, category, result_view):
+    method, fields, headings = QUERIES[(category, values["Choice"])]
+    show_report(result_view, category, method,
+                [values[field] for field in fields], headings)
+
+
+# Writes the report shown in the result grid to a file, streaming every row
+# rather than only the pages loaded so far
+def handle_export(view):
+    status_label = view["status_label"]
+    if view["report"] is None:
+        status_label.config(text="Run a query to export first.", fg="red")
+        return
+    path = filedialog.asksaveasfilename(
+        defaultextension=".csv",
+        filetypes=[("CSV", "*.csv"), ("Parquet", "*.parquet")])
+    if not path:
+        return
+    method, args, headings = view["report"]
+
+    def show_export(result):
+        rows, seconds = result
+        rate = rows / seconds if seconds else 0
+        status_label.config(
+            text=f"Exported {rows} rows to {path} in {seconds:.2f}s "
+            f"({rate:.0f} rows/s).",
+            fg="green")
+
+    status_label.config(text=f"Exporting {view['category']}...", fg="blue")
+    submit_task(status_label,
+                lambda: export_report(DB, method, args, path, headings),
+                show_export,
+                show_error(status_label),
+                key="export")
 
 
 def setup_data_entry_tab(notebook, status_label):
@@ -398,104 +527,136 @@ def setup_data_entry_tab(notebook, status_label):
     data_entry_notebook = ttk.Notebook(data_entry_tab)
     data_entry_notebook.pack(expand=True, fill="both", padx=10, pady=10)
 
-    departments_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(departments_tab, text="Departments")
-    department_fields = ["Name", "Code"]
-    add_data_fields(departments_tab, department_fields,
-                    {"Code": validate_department_code}, status_label,
-                    "Departments")
-
-    faculty_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(faculty_tab, text="Faculty")
-    faculty_fields = ["Name", "Email", "Rank", "Code"]
-    add_faculty_fields(faculty_tab, faculty_fields, {"Email": validate_email, "Code": validate_department_code },
-                       status_label)
-
-    programs_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(programs_tab, text="Programs")
-    program_fields = ["Name", "Code", "Person in Charge ID"]
-    add_data_fields(programs_tab, program_fields, {}, status_label, "Programs")
-
-    courses_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(courses_tab, text="Courses")
-    course_fields = ["ID", "Title", "Description", "Code"]
-    add_data_fields(courses_tab, course_fields, {"ID": validate_course_id, "Code": validate_department_code },
-                    status_label, "Courses")
-
-    sections_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(sections_tab, text="Sections")
-    section_fields = [
-        "ID", "Course ID", "Semester", "Instructor ID", "Enrollment Count"
-    ]
-    add_data_fields(sections_tab, section_fields, {"ID": validate_section_id},
-                    status_label, "Sections")
-
-    objectives_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(objectives_tab, text="Learning Objectives")
-    objective_fields = ["Code", "Description", "Parent Objective Code"]
-    add_data_fields(objectives_tab, objective_fields, {}, status_label,
-                    "Learning Objectives")
-
-    course_program_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(course_program_tab,
-                            text="Assign Course to Program")
-    add_course_program_assignment_fields(course_program_tab,
-                                         validation_functions, status_label)
-
-    objective_assignment_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(objective_assignment_tab, text="Assign Objectives")
-    add_objective_assignment_fields(objective_assignment_tab,
-                                    validation_functions, status_label)
-
-    evaluation_tab = ttk.Frame(data_entry_notebook)
-    data_entry_notebook.add(evaluation_tab, text="Section Evaluation")
-    add_evaluation_fields(evaluation_tab, validation_functions, status_label)
-
-
-def setup_data_query_tab(notebook, status_label):
+    for category, model, method, optional in DATA_FORMS:
+        tab = ttk.Frame(data_entry_notebook)
+        data_entry_notebook.add(tab, text=category)
+        add_form_fields(
+            tab,
+            model_fields(model, optional),
+            status_label,
+            lambda values, c=category, m=method: handle_data_submission(
+                values, status_label, c, m),
+            "Assign" if method.startswith("assign") else "Submit",
+        )
+
+
+# Query tabs: tab text, the choices offered for it and its input fields
+QUERY_FORMS = [
+    ("Department", ["faculty", "program"], ["Department Name"]),
+    ("Program", ["courses", "objectives"], ["Program Name"]),
+    ("Semester Program", ["evaluation"], ["Semester", "Program Name"]),
+    ("Year", ["evaluation", "aggregate"], ["Year"]),
+]
+
+
+def setup_data_query_tab(notebook, status_label, result_view):
     data_query_tab = ttk.Frame(notebook)
     notebook.add(data_query_tab, text="Data Query")
 
     data_query_notebook = ttk.Notebook(data_query_tab)
     data_query_notebook.pack(expand=True, fill="both", padx=10, pady=10)
 
-    # Department Queries
-    department_tab = ttk.Frame(data_query_notebook)
-    data_query_notebook.add(department_tab, text="Department")
-    department_fields = ["Choice", "Department Name"]
-    add_query_fields(department_tab, department_fields,
-                     {"Department Name": validate_department_name},
-                     status_label, "Department")
-
-    # Program Queries
-    program_tab = ttk.Frame(data_query_notebook)
-    data_query_notebook.add(program_tab, text="Program")
-    program_fields = ["Choice", "Program Name"]
-    add_query_fields(program_tab, program_fields,
-                     {"Program Name": validate_program_name}, status_label,
-                     "Program")
-
-    # Semester + Program Queries
-    semester_program_tab = ttk.Frame(data_query_notebook)
-    data_query_notebook.add(semester_program_tab, text="Semester Program")
-    semester_program_fields = ["Choice", "Semester", "Program Name"]
-    add_query_fields(semester_program_tab, semester_program_fields,
-                     {"Program Name": validate_program_name}, status_label,
-                     "Semester Program")
-
-    # Year Queries
-    year_tab = ttk.Frame(data_query_notebook)
-    data_query_notebook.add(year_tab, text="Year")
-    year_fields = ["Choice", "Year"]
-    add_query_fields(year_tab, year_fields, {"Year": validate_year},
-                     status_label, "Year")
+    for category, choices, labels in QUERY_FORMS:
+        tab = ttk.Frame(data_query_notebook)
+        data_query_notebook.add(tab, text=category)
+        fields = [query_field("Choice", choices)]
+        fields += [query_field(label) for label in labels]
+        add_form_fields(
+            tab,
+            fields,
+            status_label,
+            lambda values, c=category: handle_query_submission(
+                values, c, result_view),
+        )
+
+
+def handle_summary_rebuild(status_label):
+    status_label.config(text="Rebuilding evaluation summary...", fg="blue")
+    submit_task(
+        status_label, DB.rebuild_summary,
+        lambda result: status_label.config(
+            text="Evaluation summary rebuilt.", fg="green"),
+        show_error(status_label))
+
+
+def handle_summary_check(status_label):
+
+    def show_check(result):
+        missing, stale = result
+        if missing or stale:
+            status_label.config(
+                text=f"Evaluation summary is out of date: {len(missing)} "
+                f"rows missing, {len(stale)} stale. Rebuild it from Settings.",
+                fg="red")
+        else:
+            status_label.config(text="Evaluation summary is consistent.",
+                                fg="green")
+
+    status_label.config(text="Checking evaluation summary...", fg="blue")
+    submit_task(status_label, DB.check_summary, show_check,
+                show_error(status_label))
+
+
+def format_bucket(seconds):
+    return f"<={seconds * 1e3:g}ms" if seconds < 1 else f"<={seconds:g}s"
+
+
+# Settings > Query Statistics: calls, rows and latency per SessionManager
+# method, read from the engine's cursor events, with the result cache's
+# counters underneath
+def show_query_stats(window):
+    top = tk.Toplevel(window)
+    top.title("Query Statistics")
+
+    headings = ["Method", "Calls", "Rows", "Mean ms", "Max ms"]
+    headings += [format_bucket(bound) for bound in LATENCY_BUCKETS]
+    headings.append(f">{format_bucket(LATENCY_BUCKETS[-1])[2:]}")
+    columns = [str(i) for i in range(len(headings))]
+    tree = ttk.Treeview(top, columns=columns, show="headings", height=15)
+    for column, heading in zip(columns, headings):
+        tree.heading(column, text=heading)
+        tree.column(column, width=200 if column == "0" else 70, anchor="e")
+    tree.pack(expand=True, fill="both", padx=10, pady=10)
+    summary_label = tk.Label(top, text="")
+    summary_label.pack()
+
+    def refresh():
+        tree.delete(*tree.get_children())
+        stats = DB.query_stats.stats()
+        for method, entry in sorted(stats.items(),
+                                    key=lambda item: -item[1]["total"]):
+            tree.insert("",
+                        "end",
+                        values=[
+                            method, entry["count"], entry["rows"],
+                            f"{entry['mean'] * 1e3:.2f}",
+                            f"{entry['max'] * 1e3:.2f}"
+                        ] + entry["histogram"])
+        cache = DB.cache.stats()
+        summary_label.config(
+            text=f"Slow queries: {DB.query_stats.slow_queries}    "
+            f"Cache: {cache['size']}/{cache['maxsize']} entries, "
+            f"{cache['hits']} hits, {cache['misses']} misses")
+
+    def reset():
+        DB.query_stats.reset()
+        refresh()
+
+    buttons = tk.Frame(top)
+    buttons.pack(pady=(0, 10))
+    tk.Button(buttons, text="Refresh", command=refresh).pack(side="left")
+    tk.Button(buttons, text="Reset", command=reset).pack(side="left")
+    refresh()
 
 
 def reset_database(engine):
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
+    set_schema_version(engine, SCHEMA_VERSION)
+
 
-def initialize_gui():
+# monitor is an optional monitor.EventLoopMonitor to install on the window
+def initialize_gui(started=None, monitor=None):
     window = tk.Tk()
     window.title("University Program Evaluation System")
 
@@ -511,6 +672,24 @@ def initialize_gui():
     status_label = tk.Label(window, text="", font="Helvetica 12", fg="red")
     status_label.pack(pady=(5, 10))
 
+    settings_menu.add_command(
+        label="Rebuild Evaluation Summary",
+        command=lambda: handle_summary_rebuild(status_label))
+    settings_menu.add_command(
+        label="Check Evaluation Summary",
+        command=lambda: handle_summary_check(status_label))
+    settings_menu.add_command(label="Query Statistics",
+                              command=lambda: show_query_stats(window))
+
+    cancel_button = tk.Button(window,
+                              text="Cancel Query",
+                              command=lambda: cancel_task("query",
+                                                          status_label))
+    cancel_button.pack()
+
+    export_button = tk.Button(window, text="Export Report...")
+    export_button.pack()
+
     main_notebook = ttk.Notebook(window)
     main_notebook.pack(expand=True, fill="both", padx=10, pady=10)
 
@@ -518,518 +697,143 @@ def initialize_gui():
     setup_data_entry_tab(main_notebook, status_label)
 
     # Setup Data Query Tab
-    setup_data_query_tab(main_notebook, status_label)
-
+    result_view = setup_result_view(window, status_label)
+    setup_data_query_tab(main_notebook, status_label, result_view)
+    export_button.config(command=lambda: handle_export(result_view))
+
+    if started is not None:
+        print(f"startup took {time.perf_counter() - started:.3f}s")
+    if monitor is not None:
+        monitor.install(window)
     window.mainloop()
+    EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    if monitor is not None:
+        monitor.uninstall()
+        monitor.print_summary()
 
 
-def initialize_db(db):
+def connect_db(db):
     global DB
     DB = db
 
-    # Department
-    db.add_department("Cox School of Business", "BIZ")
-    db.add_department("Lyle School of Engineering", "ENG")
-
-    # Faculty
-    db.add_faculty("Vishal Ahuja", "vishal.ahuja@smu.edu", "associate", "BIZ")
-    db.add_faculty("Amy Altizer", "amy.altizer@smu.edu", "adjunct", "BIZ")
-    db.add_faculty("Thomas Barry", "thomas.barry@smu.edu", "full", "BIZ")
-    db.add_faculty("Wendy Bradley", "wendy.bradley@smu.edu", "assistant", "BIZ")
-
-    db.add_faculty("Frank Coyle", "frank.coyle@smu.edu", "associate", "ENG")
-    db.add_faculty("Qiguo Jing", "qiguo.jing@smu.edu", "adjunct", "ENG")
-    db.add_faculty("Theodore Manikas", "theodore.manikas@smu.edu", "full", "ENG")
-    db.add_faculty("Corey Clark", "corey.clark@smu.edu", "assistant", "ENG")
-
-    # Program
-    db.add_program("Finance", "BIZ", 3) # 1
-    db.add_program("Accounting", "BIZ", 3) # 2
-    db.add_program("Marketing", "BIZ", 3) # 3
-
-    db.add_program("Computer Science", "ENG", 7) # 4
-    db.add_program("Computer Engineering", "ENG", 7) # 5
-    db.add_program("Creative Computing", "ENG", 7) # 6
-
-    # Course
-    dummy_text = ["Writing Proficiency", "Subject Knowledge", "Communication"]
-
-    db.add_course("BIZ1000", "Intro to Finance",
-                  "Introduction to all things Finance", "BIZ")
-    db.assign_course_to_program(1, "BIZ1000") # program_id, course_id
-    for i in range(1, 3):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(1, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ1000", i, 1)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ1100", "Intro to Marketing",
-                  "Introduction to all things Marketing", "BIZ")
-    db.assign_course_to_program(3, "BIZ1100")
-    for i in range(3, 5):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(3, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ1100", i, 3)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ1200", "Intro to Accounting",
-                  "Introduction to all things Accounting", "BIZ")
-    db.assign_course_to_program(2, "BIZ1200")
-    for i in range(5, 7):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(5, i + 1)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ1200", i, 2)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ2000", "Intermediate Finance",
-                  "Intermediate class for all things Finance", "BIZ")
-    db.assign_course_to_program(1, "BIZ2000")
-    for i in range(7, 9):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(7, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ2000", i, 1)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ2100", "Intermediate Marketing",
-                  "Intermediate class for all things Marketing", "BIZ")
-    db.assign_course_to_program(3, "BIZ2100")
-    for i in range(9, 11):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(9, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ2100", i, 3)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ2200", "Intermediate Accounting",
-                  "Intermediate class for all things Accounting", "BIZ")
-    db.assign_course_to_program(2, "BIZ2200")
-    for i in range(11, 13):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(11, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ2200", i, 2)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ3000", "Advanced Finance",
-                  "Advanced class for all things Finance", "BIZ")
-    db.assign_course_to_program(1, "BIZ3000")
-    for i in range(13, 15):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(13, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ3000", i, 1)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ3100", "Advanced Marketing",
-                  "Advanced class for all things Marketing", "BIZ")
-    db.assign_course_to_program(3, "BIZ3100")
-    for i in range(15, 17):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(15, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ3100", i, 3)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("BIZ3200", "Advanced Accounting",
-                  "Advanced class for all things Accounting", "BIZ")
-    db.assign_course_to_program(2, "BIZ3200")
-    for i in range(17, 19):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(17, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("BIZ3200", i, 2)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-
-    db.add_course("ENG1000", "Intro to Computer Science",
-                  "Introduction to all things Computer Science", "ENG")
-    db.assign_course_to_program(4, "ENG1000")
-    for i in range(19, 21):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(19, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG1000", i, 4)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG1100", "Intro to Computer Engineering",
-                  "Introduction to all things Computer Engineering", "ENG")
-    db.assign_course_to_program(5, "ENG1100")
-    for i in range(21, 23):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(21, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG1100", i, 5)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG1200", "Intro to Creative Computing",
-                  "Introduction to all things Creative Computing", "ENG")
-    db.assign_course_to_program(6, "ENG1200")
-    for i in range(23, 25):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(23, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG1200", i, 6)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG2000", "Intermediate Computer Science",
-                  "Intermediate class for all things Computer Science", "ENG")
-    db.assign_course_to_program(4, "ENG2000")
-    for i in range(25, 27):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(25, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG2000", i, 4)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG2100", "Intermediate Computer Engineering",
-                  "Intermediate class for all things Computer Engineering", "ENG")
-    db.assign_course_to_program(5, "ENG2100")
-    for i in range(27, 29):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(27, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG2100", i, 5)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG2200", "Intermediate Creative Computing",
-                  "Intermediate class for all things Creative Computing", "ENG")
-    db.assign_course_to_program(6, "ENG2200")
-    for i in range(29, 31):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(29, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG2200", i, 6)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG3000", "Advanced Computer Science",
-                  "Advanced class for all things Computer Science", "ENG")
-    db.assign_course_to_program(4, "ENG3000")
-    for i in range(31, 33):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(31, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG3000", i, 4)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG3100", "Advanced Computer Engineering",
-                  "Advanced class for all things Computer Engineering", "ENG")
-    db.assign_course_to_program(5, "ENG3100")
-    for i in range(33, 35):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(33, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
-            # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG3100", i, 5)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-    db.add_course("ENG3200", "Advanced Creative Computing",
-                  "Advanced class for all things Creative Computing", "ENG")
-    db.assign_course_to_program(6, "ENG3200")
-    for i in range(35, 37):
-        isSubObjective = True if i % 2 == 0 else False
-        if isSubObjective:
-            options = [j for j in range(35, i)]
-            # id, description, parent_id (optional)
-            db.add_learning_objective(i, dummy_text[int(random() * 3)], options[int(random() * len(options))])
+
+# Load the sample data into an empty database
+def initialize_db(db):
+    connect_db(db)
+
+    start = time.perf_counter()
+
+    # Everything is committed once, so a failure leaves an empty database
+    with db.transaction():
+        # Department
+        db.bulk_add_departments([
+            ("Cox School of Business", "BIZ"),
+            ("Lyle School of Engineering", "ENG"),
+        ])
+
+        # Faculty
+        db.bulk_add_faculty([
+            ("Vishal Ahuja", "vishal.ahuja@smu.edu", "associate", "BIZ"),
+            ("Amy Altizer", "amy.altizer@smu.edu", "adjunct", "BIZ"),
+            ("Thomas Barry", "thomas.barry@smu.edu", "full", "BIZ"),
+            ("Wendy Bradley", "wendy.bradley@smu.edu", "assistant", "BIZ"),
+            ("Frank Coyle", "frank.coyle@smu.edu", "associate", "ENG"),
+            ("Qiguo Jing", "qiguo.jing@smu.edu", "adjunct", "ENG"),
+            ("Theodore Manikas", "theodore.manikas@smu.edu", "full", "ENG"),
+            ("Corey Clark", "corey.clark@smu.edu", "assistant", "ENG"),
+        ])
+
+        # Program
+        db.bulk_add_programs([
+            ("Finance", "BIZ", 3),  # 1
+            ("Accounting", "BIZ", 3),  # 2
+            ("Marketing", "BIZ", 3),  # 3
+            ("Computer Science", "ENG", 7),  # 4
+            ("Computer Engineering", "ENG", 7),  # 5
+            ("Creative Computing", "ENG", 7),  # 6
+        ])
+
+        # Course: id, title, description, department_code, program_id
+        courses = [
+            ("BIZ1000", "Intro to Finance",
+             "Introduction to all things Finance", "BIZ", 1),
+            ("BIZ1100", "Intro to Marketing",
+             "Introduction to all things Marketing", "BIZ", 3),
+            ("BIZ1200", "Intro to Accounting",
+             "Introduction to all things Accounting", "BIZ", 2),
+            ("BIZ2000", "Intermediate Finance",
+             "Intermediate class for all things Finance", "BIZ", 1),
+            ("BIZ2100", "Intermediate Marketing",
+             "Intermediate class for all things Marketing", "BIZ", 3),
+            ("BIZ2200", "Intermediate Accounting",
+             "Intermediate class for all things Accounting", "BIZ", 2),
+            ("BIZ3000", "Advanced Finance",
+             "Advanced class for all things Finance", "BIZ", 1),
+            ("BIZ3100", "Advanced Marketing",
+             "Advanced class for all things Marketing", "BIZ", 3),
+            ("BIZ3200", "Advanced Accounting",
+             "Advanced class for all things Accounting", "BIZ", 2),
+            ("ENG1000", "Intro to Computer Science",
+             "Introduction to all things Computer Science", "ENG", 4),
+            ("ENG1100", "Intro to Computer Engineering",
+             "Introduction to all things Computer Engineering", "ENG", 5),
+            ("ENG1200", "Intro to Creative Computing",
+             "Introduction to all things Creative Computing", "ENG", 6),
+            ("ENG2000", "Intermediate Computer Science",
+             "Intermediate class for all things Computer Science", "ENG", 4),
+            ("ENG2100", "Intermediate Computer Engineering",
+             "Intermediate class for all things Computer Engineering", "ENG", 5),
+            ("ENG2200", "Intermediate Creative Computing",
+             "Intermediate class for all things Creative Computing", "ENG", 6),
+            ("ENG3000", "Advanced Computer Science",
+             "Advanced class for all things Computer Science", "ENG", 4),
+            ("ENG3100", "Advanced Computer Engineering",
+             "Advanced class for all things Computer Engineering", "ENG", 5),
+            ("ENG3200", "Advanced Creative Computing",
+             "Advanced class for all things Creative Computing", "ENG", 6),
+        ]
+        db.bulk_add_courses(course[:4] for course in courses)
+        db.bulk_assign_courses_to_programs(
+            (course[4], course[0]) for course in courses)  # program_id, course_id
+
+        # Learning objectives: each course gets two, the second one being a
+        # sub-objective of the first that is also assigned to the course
+        dummy_text = ["Writing Proficiency", "Subject Knowledge", "Communication"]
+        objectives = []
+        course_objectives = []
+        for k, course in enumerate(courses):
+            parent = 2 * k + 1
+            # id, description, parent_id
+            objectives.append((parent, dummy_text[int(random() * 3)], None))
+            objectives.append((parent + 1, dummy_text[int(random() * 3)], parent))
             # course_id, objective_id, program_id
-            db.assign_objective_to_course("ENG3200", i, 6)
-        else:
-            db.add_learning_objective(i, dummy_text[int(random() * 3)])
-
-    # Section
-    semester = ["Fall", "Spring", "Summer"]
-    year = [21, 22, 23, 24, 25]
-    eval = ["Exam", "Homework", "Participation"]
-    # db.add_section(200, "Fall", 23, "BIZ1000", 3, 40) # number, semester, year, course_id, instructor_id, enrollment_count
-    # db.add_section_evaluation(1, 1, "Good", 20) # section_id, objective_id, evaluation_method, students_met
-    secid = 0
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ1000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(1, 3):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum=int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ1100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(3, 5):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ1200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(5, 7):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ2000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(7, 9):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ2100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(9, 11):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ2200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(11, 13):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ3000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(13, 15):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ3100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(15, 17):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "BIZ3200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(17, 19):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG1000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(19, 21):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG1100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(21, 23):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG1200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(23, 25):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG2000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(25, 27):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG2100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(27, 29):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG2200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(29, 31):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG3000"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(31, 33):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG3100"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(33, 35):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-    for i in range(0, 51, 10):
-        secnum = int(random() * 10) + i
-        sem = semester[int(random() * 3)]
-        yr = year[int(random() * 5)]
-        cid = "ENG3200"
-        iid = int(random() * 4) + 1
-        numstudents = int(random() * 50)
-        db.add_section(secnum, sem, yr, cid, iid, numstudents)
-        secid += 1
-        for j in range(35, 37):
-            ev = eval[int(random() * len(eval))]
-            numEvStudents = int(random() * numstudents)
-            db.add_section_evaluation(secid, j, ev, numEvStudents)
-
-    print('db initialized successfully')
+            course_objectives.append((course[0], parent + 1, course[4]))
+        db.bulk_add_learning_objectives(objectives)
+        db.bulk_assign_objectives_to_courses(course_objectives)
+
+        # Section
+        semester = ["Fall", "Spring", "Summer"]
+        year = [21, 22, 23, 24, 25]
+        eval = ["Exam", "Homework", "Participation"]
+        sections = []
+        evaluations = []
+        secid = 0
+        for k, course in enumerate(courses):
+            for i in range(0, 51, 10):
+                secnum = int(random() * 10) + i
+                sem = semester[int(random() * 3)]
+                yr = year[int(random() * 5)]
+                iid = int(random() * 4) + 1
+                numstudents = int(random() * 50)
+                secid += 1
+                # number, semester, year, course_id, instructor_id, enrollment_count, id
+                sections.append((secnum, sem, yr, course[0], iid, numstudents, secid))
+                for j in range(2 * k + 1, 2 * k + 3):
+                    ev = eval[int(random() * len(eval))]
+                    numEvStudents = int(random() * numstudents)
+                    # section_id, objective_id, evaluation_method, students_met
+                    evaluations.append((secid, j, ev, numEvStudents))
+        db.bulk_add_sections(sections)
+        db.bulk_add_section_evaluations(evaluations)
+
+    print(f'db initialized successfully in {time.perf_counter() - start:.3f}s')
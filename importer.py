@@ -0,0 +1,265 @@
+import argparse
+import csv
+import time
+from itertools import islice
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+
+from db import (
+    Course,
+    Faculty,
+    LearningObjective,
+    Section,
+    SectionEvaluations,
+    SessionManager,
+)
+from gui import Field, compile_validator, model_fields, validate_email
+
+SECTION_COLUMNS = [
+    "number",
+    "semester",
+    "year",
+    "course_id",
+    "instructor_id",
+    "enrollment_count",
+]
+EVALUATION_COLUMNS = ["section_id", "objective_id", "evaluation_method", "students_met"]
+# Evaluations may name their section by these columns instead of section_id
+SECTION_KEY = ["course_id", "number", "semester", "year"]
+
+
+# Cached key -> id lookups for resolving foreign keys. Keys not seen before
+# are fetched with one IN query per batch; keys that don't exist are cached
+# as None so they are not asked for again.
+class Lookup:
+    def __init__(self, db, key_columns, id_column):
+        self.db = db
+        self.key_columns = key_columns
+        self.id_column = id_column
+        self.cache = {}
+
+    def fetch(self, keys, chunk_size=500):
+        missing = list({key for key in keys if key not in self.cache})
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start : start + chunk_size]
+            if len(self.key_columns) == 1:
+                condition = self.key_columns[0].in_([key[0] for key in chunk])
+            else:
+                condition = tuple_(*self.key_columns).in_(chunk)
+            statement = select(*self.key_columns, self.id_column).where(condition)
+            for row in self.db.session.execute(statement):
+                self.cache[tuple(row[:-1])] = row[-1]
+            for key in chunk:
+                self.cache.setdefault(key, None)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+
+def validate_row(fields, row):
+    values = {}
+    for field in fields:
+        value = (row.get(field.name) or "").strip()
+        if not field.validator(value) or (
+            field.choices and value and value not in field.choices
+        ):
+            raise ValueError(f"invalid {field.label}: {value!r}")
+        values[field.name] = field.convert(value) if value else None
+    return values
+
+
+# Stream path through validate -> resolve -> insert in batches of
+# batch_size rows, committing each batch. A batch the database refuses is
+# retried row by row so only the offending rows are rejected. Rejected
+# rows are written to rejects_path with an extra "error" column.
+def import_csv(
+    path, fields, resolve, insert_batch, insert_row, rejects_path=None, batch_size=1000
+):
+    stats = {"rows": 0, "imported": 0, "rejected": 0}
+    start = time.perf_counter()
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        rejects_file = open(rejects_path, "w", newline="") if rejects_path else None
+        rejects = None
+        if rejects_file is not None:
+            # An empty file has no header and so no rows to reject
+            rejects = csv.DictWriter(
+                rejects_file,
+                fieldnames=(reader.fieldnames or []) + ["error"],
+                extrasaction="ignore",
+            )
+            rejects.writeheader()
+
+        def reject(row, error):
+            stats["rejected"] += 1
+            if rejects is not None:
+                rejects.writerow(dict(row, error=error))
+
+        try:
+            while True:
+                batch = list(islice(reader, batch_size))
+                if not batch:
+                    break
+                stats["rows"] += len(batch)
+                valid = []
+                for row in batch:
+                    try:
+                        valid.append((row, validate_row(fields, row)))
+                    except ValueError as e:
+                        reject(row, str(e))
+                resolved = []
+                for row, values, error in resolve(valid):
+                    if error:
+                        reject(row, error)
+                    else:
+                        resolved.append((row, values))
+                if not resolved:
+                    continue
+                try:
+                    insert_batch([values for row, values in resolved])
+                    stats["imported"] += len(resolved)
+                except SQLAlchemyError:
+                    for row, values in resolved:
+                        try:
+                            insert_row(values)
+                            stats["imported"] += 1
+                        except SQLAlchemyError as e:
+                            reject(row, str(getattr(e, "orig", e)))
+        finally:
+            if rejects_file is not None:
+                rejects_file.close()
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0
+    return stats
+
+
+def csv_header(path):
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+# Sections: number, semester, year, course_id, enrollment_count and either
+# instructor_id or instructor_email
+def import_sections(db, path, rejects_path=None, batch_size=1000):
+    header = csv_header(path)
+    fields = model_fields(Section)
+    by_email = "instructor_email" in header and "instructor_id" not in header
+    if by_email:
+        fields = [field for field in fields if field.name != "instructor_id"]
+        fields.append(
+            Field(
+                "Instructor Email",
+                "instructor_email",
+                compile_validator([validate_email]),
+                str,
+                None,
+            )
+        )
+    courses = Lookup(db, [Course.id], Course.id)
+    if by_email:
+        instructors = Lookup(db, [Faculty.email], Faculty.id)
+    else:
+        instructors = Lookup(db, [Faculty.id], Faculty.id)
+
+    def resolve(valid):
+        instructor_key = "instructor_email" if by_email else "instructor_id"
+        courses.fetch((values["course_id"],) for row, values in valid)
+        instructors.fetch((values[instructor_key],) for row, values in valid)
+        for row, values in valid:
+            instructor_id = instructors.get((values.pop(instructor_key),))
+            if courses.get((values["course_id"],)) is None:
+                yield row, values, f"unknown course {values['course_id']!r}"
+            elif instructor_id is None:
+                yield row, values, f"unknown instructor {row.get(instructor_key)!r}"
+            else:
+                values["instructor_id"] = instructor_id
+                yield row, values, None
+
+    return import_csv(
+        path,
+        fields,
+        resolve,
+        lambda rows: db.bulk_add_sections(
+            [tuple(values[name] for name in SECTION_COLUMNS) for values in rows],
+            batch_size,
+        ),
+        lambda values: db.add_section(**values),
+        rejects_path,
+        batch_size,
+    )
+
+
+# Section evaluations: objective_id, evaluation_method, students_met and
+# either section_id or the section's course_id, number, semester and year
+def import_section_evaluations(db, path, rejects_path=None, batch_size=1000):
+    header = csv_header(path)
+    fields = model_fields(SectionEvaluations)
+    by_key = "section_id" not in header and all(name in header for name in SECTION_KEY)
+    if by_key:
+        fields = [field for field in fields if field.name != "section_id"]
+        fields += [field for field in model_fields(Section) if field.name in SECTION_KEY]
+        sections = Lookup(
+            db,
+            [Section.course_id, Section.number, Section.semester, Section.year],
+            Section.id,
+        )
+    else:
+        sections = Lookup(db, [Section.id], Section.id)
+    objectives = Lookup(db, [LearningObjective.id], LearningObjective.id)
+
+    def section_key(values):
+        if by_key:
+            return tuple(values.pop(name) for name in SECTION_KEY)
+        return (values["section_id"],)
+
+    def resolve(valid):
+        keyed = [(row, values, section_key(values)) for row, values in valid]
+        sections.fetch(key for row, values, key in keyed)
+        objectives.fetch((values["objective_id"],) for row, values, key in keyed)
+        for row, values, key in keyed:
+            section_id = sections.get(key)
+            if section_id is None:
+                yield row, values, f"unknown section {key!r}"
+            elif objectives.get((values["objective_id"],)) is None:
+                yield row, values, f"unknown objective {values['objective_id']!r}"
+            else:
+                values["section_id"] = section_id
+                yield row, values, None
+
+    return import_csv(
+        path,
+        fields,
+        resolve,
+        lambda rows: db.bulk_add_section_evaluations(
+            [tuple(values[name] for name in EVALUATION_COLUMNS) for values in rows],
+            batch_size,
+        ),
+        lambda values: db.add_section_evaluation(**values),
+        rejects_path,
+        batch_size,
+    )
+
+
+IMPORTERS = {
+    "sections": import_sections,
+    "evaluations": import_section_evaluations,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import sections or evaluations from CSV")
+    parser.add_argument("kind", choices=IMPORTERS)
+    parser.add_argument("csv")
+    parser.add_argument("url", help="database URL, e.g. sqlite:///university_evaluation.db")
+    parser.add_argument("--rejects", help="write rejected rows to this CSV file")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db = SessionManager(args.url)
+    stats = IMPORTERS[args.kind](db, args.csv, args.rejects, args.batch_size)
+    print(
+        f"{stats['rows']} rows read, {stats['imported']} imported, "
+        f"{stats['rejected']} rejected in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_second']:.0f} rows/s)"
+    )
@@ -0,0 +1,137 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from db import SessionManager
+from generate import department_name, generate_data, program_name
+from gui import reset_database
+from service import make_server, percentile
+
+# Requests cycled through by every client, with arguments that match the
+# data loaded by generate_data
+REQUESTS = [
+    ("get_department_programs_by_name", {"department_name": department_name(1)}),
+    ("get_department_faculty_by_name", {"department_name": department_name(1)}),
+    ("get_program_courses_by_name", {"program_name": program_name(1, 1)}),
+    ("get_results_by_semester", {"semester": "Fall 23", "program_name": program_name(1, 1)}),
+    ("get_results_by_year", {"year": "23-24", "limit": 100}),
+    ("get_aggregate_results_by_year", {"year": "23-24"}),
+    ("get_rollup_for_objective", {"objective_id": "D001-00101-1"}),
+]
+
+
+def get(base_url, method, params):
+    url = f"{base_url}/reports/{method}?{urlencode(params)}"
+    try:
+        with urlopen(url) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+def post(base_url, method, rows):
+    request = Request(
+        f"{base_url}/bulk/{method}",
+        data=json.dumps({"rows": rows}).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urlopen(request) as response:
+            return response.status, json.load(response)
+    except HTTPError as e:
+        return e.code, json.load(e)
+
+
+# clients threads each send requests requests, every write_every-th of them
+# a bulk insert of evaluations (0 for reads only); returns the client-side
+# throughput and latency percentiles and the server's metrics
+def load_test(base_url, clients=8, requests=50, write_every=10):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def client(c):
+        nonlocal errors
+        for i in range(requests):
+            start = time.perf_counter()
+            if write_every and i % write_every == write_every - 1:
+                rows = [[1, "D001-00101-1", f"Load {c}-{i}-{k}", 1] for k in range(10)]
+                status, body = post(base_url, "bulk_add_section_evaluations", rows)
+            else:
+                method, params = REQUESTS[(c + i) % len(REQUESTS)]
+                status, body = get(base_url, method, params)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors += status != 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    elapsed = time.perf_counter() - start
+    with urlopen(f"{base_url}/metrics") as response:
+        metrics = json.load(response)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "server": metrics,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load test the JSON service; without --base-url a service "
+        "over a temporary seeded SQLite database is started"
+    )
+    parser.add_argument("--base-url", help="e.g. http://127.0.0.1:8000")
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=50, help="per client")
+    parser.add_argument(
+        "--write-every", type=int, default=10, help="every Nth request is a bulk insert"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = None
+        base_url = args.base_url
+        if base_url is None:
+            db = SessionManager(
+                f"sqlite:///{os.path.join(tmp, 'service.db')}", pool_size=args.clients
+            )
+            reset_database(db.engine)
+            generate_data(db, args.scale)
+            db.remove()
+            server = make_server(db, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            base_url = f"http://127.0.0.1:{server.server_port}"
+
+        result = load_test(base_url, args.clients, args.requests, args.write_every)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            db.engine.dispose()
+
+    print(
+        f"{result['requests']} requests, {result['errors']} errors in "
+        f"{result['seconds']:.2f}s ({result['requests_per_second']:.0f} req/s), "
+        f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, "
+        f"p99 {result['p99_ms']:.1f} ms"
+    )
+    for endpoint, stats in sorted(result["server"].items()):
+        print(
+            f"{endpoint:45} {stats['count']:6} {stats['mean_ms']:8.2f} ms mean "
+            f"{stats['p95_ms']:8.2f} ms p95"
+        )
@@ -1,17 +1,48 @@
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
-from db import SessionManager
-from gui import reset_database, initialize_db, initialize_gui
-
-
-# @event.listens_for(Engine, "connect")
-# def set_sqlite_pragma(dbapi_connection, connection_record):
-#     cursor = dbapi_connection.cursor()
-#     cursor.execute("PRAGMA foreign_keys=ON")
-#     cursor.close()
-
+import argparse
+import time
+from db import SQLITE_PROFILES, SessionManager
+from gui import reset_database, connect_db, initialize_db, initialize_gui
+from monitor import EventLoopMonitor
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="University Program Evaluation System")
+    parser.add_argument("--reset",
+                        action="store_true",
+                        help="drop and recreate every table (deletes all data)")
+    parser.add_argument("--seed",
+                        action="store_true",
+                        help="load the sample data (into an empty database)")
+    parser.add_argument("--database",
+                        choices=["mysql", "sqlite"],
+                        default="mysql",
+                        help="use the MySQL server or a local SQLite file")
+    parser.add_argument("--sqlite-profile",
+                        choices=SQLITE_PROFILES,
+                        default="tuned",
+                        help="connection PRAGMAs for --database sqlite")
+    parser.add_argument("--cache-ttl",
+                        type=float,
+                        default=30,
+                        help="seconds a cached report is served for")
+    parser.add_argument("--slow-query-ms",
+                        type=float,
+                        default=500,
+                        help="log statements slower than this")
+    parser.add_argument("--slow-query-log", default="slow_queries.log")
+    parser.add_argument("--monitor",
+                        action="store_true",
+                        help="time Tk callbacks and report mainloop stalls")
+    parser.add_argument("--slow-callback-ms",
+                        type=float,
+                        default=100,
+                        help="with --monitor, report callbacks slower than this")
+    parser.add_argument(
+        "--profile-dir",
+        help="with --monitor, write a cProfile of each slow callback here")
+    args = parser.parse_args()
+    started = time.perf_counter()
+
     sqlite_url = "sqlite:///university_evaluation.db"
     username = "cs5330"
     password = "cs5330"
@@ -21,7 +52,35 @@ if __name__ == "__main__":
     mysql_connection_string = (
         f"mysql+mysqlconnector://{username}:{password}@{hostname}:{port}/{db_name}"
     )
-    db_manager = SessionManager(mysql_connection_string)
-    reset_database(db_manager.engine)
-    initialize_db(db_manager)
-    initialize_gui()
+    if args.database == "sqlite":
+        database_uri = sqlite_url
+    else:
+        database_uri = mysql_connection_string
+    db_manager = SessionManager(
+        database_uri,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        cache_ttl=args.cache_ttl,
+        slow_query_seconds=args.slow_query_ms / 1000,
+        slow_query_log=args.slow_query_log,
+        sqlite_profile=args.sqlite_profile,
+    )
+    # Normal startup keeps the data and only migrates an out-of-date schema
+    if args.reset:
+        reset_database(db_manager.engine)
+    else:
+        applied = db_manager.migrate()
+        if applied:
+            print(f"applied schema migrations {applied}")
+    if args.seed:
+        initialize_db(db_manager)
+    else:
+        connect_db(db_manager)
+    print(f"database ready in {time.perf_counter() - started:.3f}s")
+    monitor = None
+    if args.monitor:
+        monitor = EventLoopMonitor(slow_seconds=args.slow_callback_ms / 1000,
+                                   profile_dir=args.profile_dir)
+    initialize_gui(started, monitor)
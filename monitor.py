@@ -0,0 +1,163 @@
+import cProfile
+import os
+import re
+import threading
+import time
+import tkinter as tk
+
+# Opt-in instrumentation of the Tk event loop. Every Python callback Tk runs
+# (button commands, key bindings such as the form validators, after() jobs
+# such as the task polls) goes through tkinter.CallWrapper, so timing it
+# there covers them all. A heartbeat scheduled with after() measures how
+# late the mainloop gets to it, which catches stalls from any cause.
+
+
+def callback_name(func):
+    # after() wraps its function in a closure that only borrows its name
+    for cell in getattr(func, "__closure__", None) or ():
+        try:
+            inner = cell.cell_contents
+        except ValueError:
+            continue
+        if callable(inner) and getattr(inner, "__name__", None) == func.__name__:
+            func = inner
+            break
+    code = getattr(func, "__code__", None)
+    name = getattr(func, "__qualname__", type(func).__name__)
+    if code is None:
+        return name
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class EventLoopMonitor:
+    def __init__(
+        self,
+        slow_seconds=0.1,
+        heartbeat_ms=100,
+        stall_seconds=0.2,
+        profile_dir=None,
+    ):
+        self.slow_seconds = slow_seconds
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_seconds = stall_seconds
+        # Callbacks are profiled while they run and the profile is kept
+        # only when they turn out slower than slow_seconds
+        self.profile_dir = profile_dir
+        self.lock = threading.Lock()
+        self.callbacks = {}  # name -> [count, total, slowest, slow]
+        self.stalls = 0
+        self.longest_stall = 0.0
+        self.depth = 0
+        self.original_call = None
+        self.window = None
+        self.job = None
+
+    def install(self, window):
+        if self.original_call is not None:
+            return
+        self.original_call = original_call = tk.CallWrapper.__call__
+        monitor = self
+
+        def call(wrapper, *args):
+            return monitor.run(wrapper.func, original_call, wrapper, *args)
+
+        tk.CallWrapper.__call__ = call
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+        self.window = window
+        self.last_beat = time.perf_counter()
+        self.job = window.after(self.heartbeat_ms, self.heartbeat)
+
+    def uninstall(self):
+        if self.original_call is None:
+            return
+        tk.CallWrapper.__call__ = self.original_call
+        self.original_call = None
+        if self.job is not None:
+            try:
+                self.window.after_cancel(self.job)
+            except tk.TclError:
+                pass
+            self.job = None
+
+    def heartbeat(self):
+        now = time.perf_counter()
+        late = now - self.last_beat - self.heartbeat_ms / 1000
+        if late >= self.stall_seconds:
+            with self.lock:
+                self.stalls += 1
+                self.longest_stall = max(self.longest_stall, late)
+            print(f"mainloop stalled for {late * 1e3:.0f}ms")
+        self.last_beat = now
+        self.job = self.window.after(self.heartbeat_ms, self.heartbeat)
+
+    def run(self, func, call, *args):
+        if getattr(func, "__name__", None) == "heartbeat":
+            return call(*args)
+        # Only the outermost callback is profiled; Tk can run callbacks
+        # inside one another (update(), wait_window()) and cProfile cannot
+        # nest
+        profiler = None
+        if self.profile_dir and self.depth == 0:
+            profiler = cProfile.Profile()
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            return call(*args)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            seconds = time.perf_counter() - start
+            self.depth -= 1
+            self.record(func, seconds, profiler)
+
+    def record(self, func, seconds, profiler):
+        name = callback_name(func)
+        slow = seconds >= self.slow_seconds
+        with self.lock:
+            entry = self.callbacks.setdefault(name, [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            entry[3] += slow
+        if slow:
+            print(f"slow Tk callback {name}: {seconds * 1e3:.0f}ms")
+            if profiler is not None:
+                stem = re.sub(r"[^\w.-]+", "_", name).strip("_")
+                path = os.path.join(
+                    self.profile_dir,
+                    f"{time.strftime('%Y%m%d-%H%M%S')}-{stem}.prof",
+                )
+                profiler.dump_stats(path)
+                print(f"  profile written to {path}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "callbacks": {
+                    name: {
+                        "count": count,
+                        "mean": total / count,
+                        "max": slowest,
+                        "slow": slow,
+                    }
+                    for name, (count, total, slowest, slow) in self.callbacks.items()
+                },
+                "stalls": self.stalls,
+                "longest_stall": self.longest_stall,
+            }
+
+    def print_summary(self):
+        stats = self.stats()
+        print(
+            f"Tk event loop: {stats['stalls']} stalls, longest "
+            f"{stats['longest_stall'] * 1e3:.0f}ms"
+        )
+        callbacks = sorted(stats["callbacks"].items(), key=lambda item: -item[1]["max"])
+        for name, entry in callbacks:
+            print(
+                f"{name:60} {entry['count']:6} calls {entry['mean'] * 1e3:8.2f}ms mean "
+                f"{entry['max'] * 1e3:8.2f}ms max {entry['slow']:4} slow"
+            )
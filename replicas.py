@@ -0,0 +1,113 @@
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db import SessionManager
+from generate import department_code, department_name, generate_data, program_name
+from gui import reset_database
+
+# Local stand-in for replication: SQLite files kept in sync with the
+# primary by copying it over with the online backup API, so SessionManager's
+# read/write splitting can be tried without a MySQL replica set.
+
+
+def sqlite_path(url):
+    return url.split("///", 1)[1]
+
+
+def sync_replicas(primary_url, replica_urls):
+    source = sqlite3.connect(sqlite_path(primary_url))
+    try:
+        for url in replica_urls:
+            target = sqlite3.connect(sqlite_path(url))
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    finally:
+        source.close()
+
+
+# Runs reports from several threads and shows how reads were routed, then
+# writes a program on the primary without syncing and reads it back from
+# the same thread, which only sees it when read_your_writes is on
+def demo(tmp, replicas, policy, read_your_writes, scale, clients, reads):
+    primary_url = f"sqlite:///{os.path.join(tmp, 'primary.db')}"
+    replica_urls = [
+        f"sqlite:///{os.path.join(tmp, f'replica-{i}.db')}" for i in range(replicas)
+    ]
+    db = SessionManager(primary_url)
+    reset_database(db.engine)
+    generate_data(db, scale)
+    db.engine.dispose()
+    sync_replicas(primary_url, replica_urls)
+
+    db = SessionManager(
+        primary_url,
+        cache_size=0,
+        replica_uris=replica_urls,
+        replica_policy=policy,
+        read_your_writes=read_your_writes,
+    )
+
+    def client(c):
+        try:
+            for i in range(reads):
+                db.get_results_by_semester("Fall 23", program_name(1, 1 + (c + i) % 3))
+        finally:
+            db.remove()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(client, range(clients)))
+    elapsed = time.perf_counter() - start
+    stats = db.replica_stats()
+    print(
+        f"{clients * reads} reads in {elapsed:.2f}s with {policy}: "
+        f"primary {stats['primary_reads']}, replicas {stats['replica_reads']}"
+    )
+
+    name = "Program written after sync"
+    db.add_program(name, department_code(1), 1)
+    seen = [row[0] for row in db.get_department_programs_by_name(department_name(1))]
+    where = "primary" if read_your_writes else "a replica that has not caught up"
+    print(
+        f"after a write, read from {where}: new program "
+        f"{'visible' if name in seen else 'not visible'}"
+    )
+    db.remove()
+    for engine in [db.engine] + db.replica_engines:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Try read/write splitting against SQLite replicas"
+    )
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument(
+        "--policy", choices=["round_robin", "least_loaded"], default="round_robin"
+    )
+    parser.add_argument(
+        "--read-your-writes",
+        type=float,
+        help="seconds a thread reads from the primary after it writes",
+    )
+    parser.add_argument("--scale", default="small")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--reads", type=int, default=50, help="per client")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        demo(
+            tmp,
+            args.replicas,
+            args.policy,
+            args.read_your_writes,
+            args.scale,
+            args.clients,
+            args.reads,
+        )
@@ -0,0 +1,239 @@
+import argparse
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy.exc import IntegrityError
+
+from db import SessionManager
+
+# GET /reports/<method>?<argument>=... runs a tabular get_* report; add
+# limit (and the returned next_after as after) to page through it.
+# POST /bulk/<method> with {"rows": [[...], ...]} runs a bulk_* loader.
+# GET /metrics returns request counts and latency percentiles per endpoint.
+REPORTS = [
+    "get_department_programs_by_name",
+    "get_department_faculty_by_name",
+    "get_program_courses_by_name",
+    "get_program_objectives_by_name",
+    "get_results_by_semester",
+    "get_results_by_year",
+    "get_aggregate_results_by_year",
+    "get_objective_subtree",
+    "get_rollup_for_objective",
+]
+# method -> [(argument, required)]; arguments with a default may be left out
+REPORT_ARGUMENTS = {
+    method: [
+        (name, parameter.default is inspect.Parameter.empty)
+        for name, parameter in inspect.signature(
+            getattr(SessionManager, method)
+        ).parameters.items()
+        if name not in ("self", "stream", "after", "limit")
+    ]
+    for method in REPORTS
+}
+PAGED_REPORTS = {
+    method
+    for method in REPORTS
+    if "limit" in inspect.signature(getattr(SessionManager, method)).parameters
+}
+BULK_METHODS = [name for name in vars(SessionManager) if name.startswith("bulk_")]
+LATENCY_SAMPLES = 1000  # most recent latencies kept per endpoint
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}  # endpoint -> [count, errors, total, samples]
+
+    def record(self, endpoint, seconds, error=False):
+        with self.lock:
+            if endpoint not in self.endpoints:
+                self.endpoints[endpoint] = [0, 0, 0.0, deque(maxlen=LATENCY_SAMPLES)]
+            entry = self.endpoints[endpoint]
+            entry[0] += 1
+            entry[1] += error
+            entry[2] += seconds
+            entry[3].append(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = {
+                endpoint: (count, errors, total, list(samples))
+                for endpoint, (count, errors, total, samples) in self.endpoints.items()
+            }
+        return {
+            endpoint: {
+                "count": count,
+                "errors": errors,
+                "mean_ms": total / count * 1e3,
+                "p50_ms": percentile(samples, 0.5) * 1e3,
+                "p95_ms": percentile(samples, 0.95) * 1e3,
+                "p99_ms": percentile(samples, 0.99) * 1e3,
+                "max_ms": max(samples) * 1e3,
+            }
+            for endpoint, (count, errors, total, samples) in endpoints.items()
+        }
+
+
+def to_json(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def run_report(db, method, query):
+    if method not in REPORT_ARGUMENTS:
+        raise ServiceError(404, f"no report {method}")
+    arguments = REPORT_ARGUMENTS[method]
+    missing = [name for name, required in arguments if required and name not in query]
+    if missing:
+        raise ServiceError(400, f"missing arguments: {', '.join(missing)}")
+    args = {name: query[name][0] for name, required in arguments if name in query}
+    if "limit" not in query:
+        return {"rows": getattr(db, method)(**args)}
+    if method not in PAGED_REPORTS:
+        raise ServiceError(400, f"{method} cannot be paged")
+    try:
+        limit = int(query["limit"][0])
+        after = tuple(json.loads(query["after"][0])) if "after" in query else None
+    except ValueError:
+        raise ServiceError(400, "limit must be an integer and after a JSON list")
+    rows, next_after = getattr(db, method)(**args, after=after, limit=limit)
+    return {"rows": rows, "next_after": next_after}
+
+
+def run_bulk(db, method, body):
+    if method not in BULK_METHODS:
+        raise ServiceError(404, f"no bulk loader {method}")
+    try:
+        rows = json.loads(body)["rows"]
+    except (ValueError, KeyError, TypeError):
+        raise ServiceError(400, 'body must be JSON like {"rows": [[...], ...]}')
+    getattr(db, method)(tuple(row) for row in rows)
+    return {"rows": len(rows)}
+
+
+# One handler thread per request (ThreadingHTTPServer); each thread uses its
+# own scoped session and hands the connection back to the pool when done
+class ServiceHandler(BaseHTTPRequestHandler):
+    db = None
+    metrics = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if parts == ["metrics"]:
+            self.respond("/metrics", lambda: self.metrics.snapshot())
+        elif len(parts) == 2 and parts[0] == "reports":
+            self.respond(
+                url.path,
+                lambda: run_report(self.db, parts[1], parse_qs(url.query)),
+            )
+        else:
+            self.respond(url.path, lambda: self.not_found())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "bulk":
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            self.respond(url.path, lambda: run_bulk(self.db, parts[1], body))
+        else:
+            self.respond(url.path, lambda: self.not_found())
+
+    def not_found(self):
+        raise ServiceError(404, f"no endpoint {self.path}")
+
+    def respond(self, endpoint, fn):
+        start = time.perf_counter()
+        status = 200
+        try:
+            result = fn()
+        except ServiceError as e:
+            status, result = e.status, {"error": str(e)}
+        except IntegrityError as e:
+            status, result = 409, {"error": str(e.orig)}
+        except (TypeError, ValueError, IndexError) as e:
+            status, result = 400, {"error": str(e)}
+        except Exception as e:
+            status, result = 500, {"error": str(e)}
+        finally:
+            self.db.remove()
+        body = json.dumps(result, default=to_json).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Unknown paths share one entry so scanners can't grow the table
+        if status == 404:
+            endpoint = "(not found)"
+        self.metrics.record(endpoint, time.perf_counter() - start, status >= 400)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# socketserver's default listen backlog of 5 makes bursts of concurrent
+# clients wait out a TCP retransmit (about a second) to connect
+class ServiceServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+def make_server(db, host="127.0.0.1", port=8000):
+    handler = type(
+        "Handler", (ServiceHandler,), {"db": db, "metrics": Metrics()}
+    )
+    return ServiceServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the evaluation reports as JSON")
+    parser.add_argument("url", help="database URL, e.g. sqlite:///university_evaluation.db")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument(
+        "--cache-ttl", type=float, default=30, help="seconds a cached report is served for"
+    )
+    args = parser.parse_args()
+
+    db = SessionManager(
+        args.url,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        cache_ttl=args.cache_ttl,
+    )
+    server = make_server(db, args.host, args.port)
+    print(f"serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.engine.dispose()
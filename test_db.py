@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+from db import RESULTS_BY_SEMESTER, RESULTS_BY_YEAR_SUMMARY, SessionManager
+from generate import department_name, generate_data, program_name
+from gui import reset_database
+
+
+def seeded(path, scale="small", **sizes):
+    db = SessionManager(f"sqlite:///{path}", cache_size=0)
+    reset_database(db.engine)
+    generate_data(db, scale, **sizes)
+    db.remove()
+    return db
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = seeded(tmp_path / "test.db")
+    yield db
+    db.remove()
+    db.engine.dispose()
+
+
+# SQLite's EXPLAIN QUERY PLAN for statement, one detail string per step
+def query_plan(db, statement, params):
+    compiled = statement.compile(dialect=db.engine.dialect)
+    values = compiled.construct_params(params)
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {compiled}",
+            tuple(values[name] for name in compiled.positiontup),
+        )
+        return [row[-1] for row in rows]
+
+
+def test_results_by_semester_uses_semester_year_index(db):
+    plan = query_plan(
+        db,
+        RESULTS_BY_SEMESTER,
+        {"semester": "Fall", "year": 23, "program_name": program_name(1, 1)},
+    )
+    assert any("ix_sections_semester_year" in step for step in plan), plan
+
+
+def test_results_by_year_uses_summary_index(db):
+    plan = query_plan(db, RESULTS_BY_YEAR_SUMMARY, {"first_year": 23})
+    assert any("ix_evaluation_summary_year_course" in step for step in plan), plan
+
+
+# Statements run by each graph method; eager loading should make it the
+# same however many programs, courses and sections there are
+def graph_statements(db):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        db.get_department_graph(department_name(1))
+        department = len(statements)
+        db.remove()
+        db.get_programs_graph()
+        programs = len(statements) - department
+        db.remove()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    return department, programs
+
+
+def test_graph_statement_count_does_not_grow_with_data(tmp_path):
+    small = seeded(tmp_path / "small.db")
+    larger = seeded(
+        tmp_path / "larger.db", programs=5, courses=6, sections=12, faculty=15
+    )
+    try:
+        assert graph_statements(small) == graph_statements(larger)
+    finally:
+        small.engine.dispose()
+        larger.engine.dispose()